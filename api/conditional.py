@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def has_validators(request: Request) -> bool:
+    """Есть ли в запросе условные заголовки, ради которых стоит делать пробу."""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite отдает naive datetime; в БД всегда хранится UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def make_etag(resource_id: str, updated_at: datetime, version: int | None = None) -> str:
+    """Сильный ETag из идентификатора, времени изменения и (опционально) версии."""
+    raw = f"{resource_id}:{_as_utc(updated_at).isoformat()}:{version or ''}"
+    return '"' + hashlib.blake2s(raw.encode(), digest_size=16).hexdigest() + '"'
+
+
+def validator_headers(etag: str, updated_at: datetime) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(_as_utc(updated_at).replace(microsecond=0), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def is_not_modified(request: Request, etag: str, updated_at: datetime) -> bool:
+    """RFC 9110 §13.2.2: If-None-Match имеет приоритет над If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and _as_utc(updated_at).replace(microsecond=0) <= since
+    return False
+
+
+def _parse_http_date(value: str) -> datetime | None:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo is not None else None
+
+
+def is_precondition_failed(request: Request, etag: str, updated_at: datetime) -> bool:
+    """If-Match (строгое сравнение) и If-Unmodified-Since, RFC 9110 §13.1.1, §13.1.4."""
+    if_match = request.headers.get("if-match")
+    if if_match is not None:
+        if if_match.strip() == "*":
+            return False
+        return etag not in {tag.strip() for tag in if_match.split(",")}
+    if_unmodified_since = request.headers.get("if-unmodified-since")
+    if if_unmodified_since is not None:
+        since = _parse_http_date(if_unmodified_since)
+        return since is not None and _as_utc(updated_at).replace(microsecond=0) > since
+    return False
+
+
+class RangeNotSatisfiable(ValueError):
+    """Диапазон целиком за пределами объекта — ответ 416."""
+
+
+def requested_range(request: Request, size: int, etag: str, updated_at: datetime) -> tuple[int, int] | None:
+    """Запрошенный диапазон байтов `(first, last)` включительно; None — отдать объект целиком.
+
+    Поддерживается один диапазон `bytes=`: несколько диапазонов и некорректный
+    заголовок игнорируются, как разрешает RFC 9110 §14.2. Диапазон применяется,
+    только если If-Range совпадает с текущим ETag или Last-Modified.
+    """
+    header = request.headers.get("range")
+    if header is None:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None:
+        if_range = if_range.strip()
+        if if_range.startswith(('"', "W/")):
+            if if_range != etag:
+                return None
+        elif _parse_http_date(if_range) != _as_utc(updated_at).replace(microsecond=0):
+            return None
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:
+        # Суффикс: последние N байт
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, (min(int(last), size - 1) if last else size - 1)
@@ -1,27 +1,59 @@
 from __future__ import annotations
 
+import time
+from dataclasses import dataclass
 from datetime import timedelta
+from typing import Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.settings import settings
 from domain.models.user import Role, User
-from infrastructure.auth.security import verify_password
+from infrastructure.auth.security import verify_password_async
 from apps.core.user_service import user_service
 from config.logging import get_logger
+from infrastructure.cache.memory import TTLCache
+from infrastructure.db.session import get_db_session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 logger = get_logger(__name__)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+@dataclass(frozen=True, slots=True)
+class _VerifiedToken:
+    claims: dict[str, Any]
+    user: User
+    revision: int
+
+
+# Токен -> проверенные claims и пользователь. Запись живет не дольше `exp`
+# токена и сверяется с ревизией пользователя, так что изменение или
+# деактивация учетной записи вытесняют ее при следующем обращении.
+_token_cache: TTLCache[str, _VerifiedToken] = TTLCache(
+    "auth_token",
+    maxsize=settings.security.token_cache_max_entries,
+    ttl=settings.security.token_cache_max_ttl_seconds,
+)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_db_session),
+) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached = _token_cache.get(token)
+    if cached is not None:
+        if cached.revision == user_service.revision(cached.user.email):
+            return cached.user
+        _token_cache.pop(token)
+
     try:
         payload = jwt.decode(
             token,
@@ -34,9 +66,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError as exc:  # pragma: no cover - внешняя библиотека
         raise credentials_exception from exc
 
-    user = user_service.get_user_by_email(email)
-    if user is None:
+    user = await user_service.get_user_by_email(session, email)
+    if user is None or not user.is_active:
         raise credentials_exception
+    revision = user_service.revision(user.email)
+    expires_in = float(payload.get("exp", 0)) - time.time()
+    _token_cache.set(
+        token,
+        _VerifiedToken(claims=payload, user=user, revision=revision),
+        ttl=min(expires_in, _token_cache.ttl),
+    )
     return user
 
 
@@ -49,12 +88,14 @@ def require_roles(*roles: Role):
     return role_checker
 
 
-async def authenticate_user(email: str, password: str) -> User | None:
-    user = user_service.get_user_by_email(email)
-    if not user:
+async def authenticate_user(session: AsyncSession, email: str, password: str) -> User | None:
+    user = await user_service.get_user_by_email(session, email)
+    if user is None and user_service.is_admin_login(email):
+        user = await user_service.ensure_admin(session)
+    if not user or not user.is_active:
         logger.info("auth_user_not_found", email=email)
         return None
-    ok = verify_password(password, user.hashed_password)
+    ok = await verify_password_async(password, user.hashed_password)
     if not ok:
         logger.info("auth_password_mismatch", email=email)
         return None
@@ -1,30 +1,74 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
 
-from api.routers.v1 import auth, intake, script, assets
+from api.compression import CompressionMiddleware
+from api.responses import PydanticJSONResponse
+from api.routers.v1 import auth, intake, script, assets, uploads
+from apps.assets.uploads import upload_session_service
+from apps.assets.verification import asset_verifier
+from apps.core.user_service import user_service
 from config.logging import setup_logging
 from config.settings import settings
-from infrastructure.db.base import Base
-from infrastructure.db.session import get_engine
-from infrastructure.storage.minio_client import ensure_bucket_exists
+from infrastructure.auth.security import close_password_hasher
+from infrastructure.cache.shared import close_redis
+from infrastructure.db.schema import verify_schema
+from infrastructure.db.session import get_engine, get_session_factory
+from infrastructure.storage.minio_client import close_storage, init_storage
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Ресурсы процесса: проверка ревизии схемы БД, хранилище, кеши."""
+    engine = get_engine()
+    await verify_schema(engine)
+    if settings.demo_user.admin_password_hash:
+        async with get_session_factory()() as session:
+            await user_service.ensure_admin(session)
+    await init_storage()
+    background = [
+        asyncio.create_task(user_service.run_sync(get_session_factory())),
+        asyncio.create_task(asset_verifier.run(get_session_factory())),
+        asyncio.create_task(upload_session_service.run_sweeper(get_session_factory())),
+    ]
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        for task in background:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await close_storage()
+        await close_redis()
+        await close_password_hasher()
+        await engine.dispose()
 
-app = FastAPI(title="Auto Video Platform API", version="0.1.0")
+
+app = FastAPI(
+    title="Auto Video Platform API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=PydanticJSONResponse,
+)
 
 setup_logging(settings.log_level)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.api.compression_min_size,
+    gzip_level=settings.api.gzip_level,
+    brotli_quality=settings.api.brotli_quality,
+)
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(intake.router, prefix="/api/v1/intake", tags=["intake"])
 app.include_router(script.router, prefix="/api/v1/script", tags=["script"])
 app.include_router(assets.router, prefix="/api/v1/assets", tags=["assets"])
-
-
-@app.on_event("startup")
-async def on_startup() -> None:
-    """Создать таблицы при старте (временное решение вместо Alembic)."""
-    engine = get_engine()
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    # Обеспечить наличие бакета для ассетов
-    from config.settings import settings as _settings
-    ensure_bucket_exists(_settings.storage.bucket_assets)
+app.include_router(uploads.router, prefix="/api/v1/assets", tags=["assets"])
+app.mount("/metrics", make_asgi_app())
 
 
 @app.get("/healthz", tags=["meta"])
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый напрямую pydantic-core.
+
+    Модели и ORM-строки, уже провалидированные схемой, превращаются в байты
+    за один проход на стороне Rust, без промежуточных dict и `json.dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
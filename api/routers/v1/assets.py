@@ -1,24 +1,58 @@
 from __future__ import annotations
 
+import json
 from datetime import timedelta
-from uuid import uuid4
+from typing import Literal
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from minio.error import S3Error
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
 
+from api.conditional import (
+    RangeNotSatisfiable,
+    has_validators,
+    is_not_modified,
+    is_precondition_failed,
+    make_etag,
+    requested_range,
+    validator_headers,
+)
 from api.deps import require_roles
+from api.responses import PydanticJSONResponse
 from api.schemas.assets import (
     AssetAttachRequest,
+    AssetBatchAttachResponse,
     AssetListResponse,
     AssetResponse,
+    AssetUploadURLBatchItem,
+    AssetUploadURLBatchRequest,
+    AssetUploadURLBatchResponse,
     AssetUploadURLRequest,
     AssetUploadURLResponse,
 )
-from apps.assets.service import asset_service
+from api.schemas.common import BatchCreateRequest, parse_fields, raw_values, sparse_items, validate_items
+from apps.assets.meta_filters import parse_meta_filters
+from apps.assets.service import asset_service, claimed_sha256_hash, new_object_key, sha256_content_hash
+from apps.assets.streaming import ObjectTooLarge, upload_stream
+from apps.assets.verification import asset_verifier
+from apps.intake.service import intake_service
 from config.settings import settings
 from domain.models.user import User
+from infrastructure.cache.presigned import presigned_url_cache
+from infrastructure.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from infrastructure.db.session import get_db_session
-from infrastructure.storage.minio_client import create_presigned_get, create_presigned_put
+from infrastructure.storage.minio_client import (
+    MISSING_OBJECT_CODES,
+    create_presigned_put,
+    create_presigned_puts,
+    iter_object,
+    open_object,
+    stat_object,
+)
 
 AUTHORIZED_ROLES_CREATE = ("marketing", "producer", "admin")
 AUTHORIZED_ROLES_READ = ("marketing", "producer", "legal", "brand", "admin")
@@ -27,112 +61,247 @@ AUTHORIZED_ROLES_WRITE = ("marketing", "producer", "admin")
 router = APIRouter()
 
 
+UPLOAD_URL_TTL = timedelta(minutes=15)
+
+
+def _existing_object(duplicates: dict[str, Row], item: AssetUploadURLRequest) -> str | None:
+    """Ключ уже загруженного объекта с тем же содержимым; размер, если указан, должен совпасть."""
+    row = duplicates.get(sha256_content_hash(item.sha256)) if item.sha256 else None
+    if row is None or (item.size is not None and row.size != item.size):
+        return None
+    return row.object_key
+
+
+def _attach_args(item: AssetAttachRequest) -> dict:
+    return {**item.model_dump(exclude={"sha256"}), "content_hash": claimed_sha256_hash(item.sha256)}
+
+
+def _content_disposition(filename: str) -> str:
+    fallback = "".join(ch if 32 <= ord(ch) < 127 and ch not in '"\\' else "_" for ch in filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
 @router.post("/upload-url", response_model=AssetUploadURLResponse)
 async def create_upload_url(
     payload: AssetUploadURLRequest,
+    session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
 ) -> AssetUploadURLResponse:
-    object_key = f"briefs/{payload.brief_id}/{uuid4()}_{payload.filename}"
-    url = create_presigned_put(
+    """С `sha256` сначала ищется объект с тем же содержимым, хеш которого
+    посчитал сервер (потоковая загрузка); хеши от клиентов не сопоставляются.
+
+    Если он есть, ответ `exists=true` без URL: файл не загружается, его
+    `object_key` передается в attach, и ассеты делят один объект.
+    """
+    if payload.sha256:
+        duplicates = await asset_service.find_duplicates(session, [sha256_content_hash(payload.sha256)])
+        existing = _existing_object(duplicates, payload)
+        if existing is not None:
+            return AssetUploadURLResponse(object_key=existing, upload_url=None, exists=True)
+    object_key = new_object_key(payload.brief_id, payload.filename)
+    url = await create_presigned_put(
         bucket=settings.storage.bucket_assets,
         object_key=object_key,
-        expires=timedelta(minutes=15),
-        content_type=payload.content_type,
+        expires=UPLOAD_URL_TTL,
     )
     return AssetUploadURLResponse(object_key=object_key, upload_url=url)
 
 
+@router.post("/upload-urls:batch", response_model=AssetUploadURLBatchResponse)
+async def create_upload_urls_batch(
+    payload: AssetUploadURLBatchRequest,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    """URL загрузки для целой съемки одним запросом.
+
+    Все подписи делаются одной задачей в пуле хранилища общим клиентом;
+    элемент ответа несет `index` своего элемента запроса. Уже загруженные
+    файлы (по `sha256`) ищутся одним запросом и возвращаются с `exists=true`.
+    """
+    valid, errors = validate_items(AssetUploadURLRequest, payload.items)
+    failed = {error.index for error in errors}
+    indexes = [index for index in range(len(payload.items)) if index not in failed]
+    duplicates = await asset_service.find_duplicates(
+        session, [sha256_content_hash(item.sha256) for item in valid if item.sha256]
+    )
+    existing = [_existing_object(duplicates, item) for item in valid]
+    object_keys = [
+        key if key is not None else new_object_key(item.brief_id, item.filename)
+        for item, key in zip(valid, existing)
+    ]
+    urls = iter(
+        await create_presigned_puts(
+            bucket=settings.storage.bucket_assets,
+            object_keys=[key for key, found in zip(object_keys, existing) if found is None],
+            expires=UPLOAD_URL_TTL,
+        )
+    )
+    items = [
+        AssetUploadURLBatchItem(
+            index=index,
+            object_key=key,
+            upload_url=None if found is not None else next(urls),
+            exists=found is not None,
+        )
+        for index, key, found in zip(indexes, object_keys, existing)
+    ]
+    return PydanticJSONResponse(
+        AssetUploadURLBatchResponse(
+            items=items, errors=errors, expires_in=int(UPLOAD_URL_TTL.total_seconds())
+        )
+    )
+
+
+@router.post("/upload", response_model=AssetResponse, status_code=status.HTTP_201_CREATED)
+async def upload_asset(
+    request: Request,
+    brief_id: str,
+    filename: str = Query(..., max_length=255),
+    type: Literal["image", "audio", "video", "doc"] = Query(...),
+    meta: str | None = Query(None, description="JSON-объект метаданных"),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    """Загрузка файла телом запроса — для инструментов без presigned PUT.
+
+    Тело (сырые байты, не multipart/form-data) передается в хранилище
+    частями по мере чтения, без буферизации файла целиком и без временных
+    файлов; размер и SHA-256 считаются на лету, ассет сразу `verified`.
+    Content-Type запроса становится Content-Type объекта.
+    """
+    content_type = request.headers.get("content-type") or "application/octet-stream"
+    if len(content_type) > 128:
+        raise HTTPException(status_code=422, detail="Content-Type is too long")
+    try:
+        meta_value = json.loads(meta) if meta is not None else None
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=422, detail="meta must be a JSON object") from exc
+    if meta_value is not None and not isinstance(meta_value, dict):
+        raise HTTPException(status_code=422, detail="meta must be a JSON object")
+    # Бриф проверяется до чтения тела, чтобы не гонять файл впустую
+    if not await intake_service.existing_ids(session, [brief_id]):
+        raise HTTPException(status_code=422, detail="Brief not found")
+    # Не держать соединение из пула, пока идет загрузка
+    await session.rollback()
+    try:
+        obj = await upload_stream(
+            session,
+            request.stream(),
+            brief_id=brief_id,
+            filename=filename,
+            content_type=content_type,
+            type=type,
+            meta=meta_value,
+            created_by=current_user.email,
+        )
+    except ObjectTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except ClientDisconnect as exc:
+        raise HTTPException(status_code=400, detail="Upload interrupted") from exc
+    return PydanticJSONResponse(AssetResponse.model_validate(obj), status_code=status.HTTP_201_CREATED)
+
+
 @router.post("/attach", response_model=AssetResponse, status_code=status.HTTP_201_CREATED)
 async def attach_uploaded_asset(
     payload: AssetAttachRequest,
     session: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
-) -> AssetResponse:
-    obj = await asset_service.attach(
-        session,
-        brief_id=payload.brief_id,
-        object_key=payload.object_key,
-        filename=payload.filename,
-        content_type=payload.content_type,
-        size=payload.size,
-        type=payload.type,
-        created_by=current_user.email,
-        meta=payload.meta,
-    )
-    return AssetResponse.model_validate(
-        {
-            "id": obj.id,
-            "brief_id": obj.brief_id,
-            "filename": obj.filename,
-            "content_type": obj.content_type,
-            "size": obj.size,
-            "object_key": obj.object_key,
-            "url": obj.url,
-            "type": obj.type,
-            "status": obj.status,
-            "meta": obj.meta,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at,
-            "updated_at": obj.updated_at,
-        }
+) -> Response:
+    """Регистрирует загруженный объект со статусом `uploaded`.
+
+    Размер и Content-Type от клиента предварительные: фоновая проверка
+    сверяет объект в хранилище и переводит ассет в `verified` или `missing`.
+    `sha256` сохраняется как заявленный клиентом: хранилище его не проверяет,
+    поэтому источником дедупликации он не становится.
+    """
+    try:
+        obj = await asset_service.attach(session, **_attach_args(payload), created_by=current_user.email)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    asset_verifier.notify()
+    return PydanticJSONResponse(AssetResponse.model_validate(obj), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/attach:batch", response_model=AssetBatchAttachResponse, status_code=status.HTTP_201_CREATED)
+async def attach_uploaded_assets_batch(
+    payload: BatchCreateRequest,
+    session: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    known = await intake_service.existing_ids(session, raw_values(payload.items, "brief_id"))
+    valid, errors = validate_items(AssetAttachRequest, payload.items, references={"brief_id": known})
+    try:
+        objs = await asset_service.attach_many(
+            session, [_attach_args(item) for item in valid], created_by=current_user.email
+        )
+    except ValueError as exc:
+        # Бриф удален между проверкой и вставкой
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if objs:
+        asset_verifier.notify()
+    return PydanticJSONResponse(
+        AssetBatchAttachResponse(items=objs, errors=errors), status_code=status.HTTP_201_CREATED
     )
 
 
 @router.get("/assets", response_model=AssetListResponse)
 async def list_assets(
+    request: Request,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
     brief_id: str | None = None,
-) -> AssetListResponse:
-    objs = await asset_service.list(session, brief_id=brief_id)
-    items = [
-        AssetResponse.model_validate(
-            {
-                "id": o.id,
-                "brief_id": o.brief_id,
-                "filename": o.filename,
-                "content_type": o.content_type,
-                "size": o.size,
-                "object_key": o.object_key,
-                "url": o.url,
-                "type": o.type,
-                "status": o.status,
-                "meta": o.meta,
-                "created_by": o.created_by,
-                "created_at": o.created_at,
-                "updated_at": o.updated_at,
-            }
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Поля элементов через запятую; выбираются только эти колонки"),
+) -> Response:
+    """Фильтры по `meta` — параметры вида `meta.<key>[<op>]=<value>`.
+
+    Операторы: `eq` (по умолчанию), `lt`, `lte`, `gt`, `gte`, `contains`
+    (элемент массива). Например: `?brief_id=X&meta.aspect_ratio=9:16&meta.duration[lt]=15`.
+    """
+    try:
+        columns = parse_fields(fields, AssetResponse)
+        meta_filters = parse_meta_filters(request.query_params.multi_items())
+        page = await asset_service.list(
+            session, brief_id=brief_id, limit=limit, cursor=cursor, fields=columns, meta_filters=meta_filters
         )
-        for o in objs
-    ]
-    return AssetListResponse(items=items)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if columns is not None:
+        return PydanticJSONResponse(
+            {"items": sparse_items(page.items, columns), "limit": limit, "next_cursor": page.next_cursor}
+        )
+    return PydanticJSONResponse(
+        AssetListResponse(items=page.items, limit=limit, next_cursor=page.next_cursor)
+    )
 
 
 @router.get("/assets/{asset_id}", response_model=AssetResponse)
 async def get_asset(
     asset_id: str,
+    request: Request,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
-) -> AssetResponse:
+) -> Response:
+    if has_validators(request):
+        probe = await asset_service.probe(session, asset_id)
+        if probe is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        etag = make_etag(asset_id, probe.updated_at)
+        if is_not_modified(request, etag, probe.updated_at):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=validator_headers(etag, probe.updated_at),
+            )
     obj = await asset_service.get(session, asset_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Asset not found")
-    return AssetResponse.model_validate(
-        {
-            "id": obj.id,
-            "brief_id": obj.brief_id,
-            "filename": obj.filename,
-            "content_type": obj.content_type,
-            "size": obj.size,
-            "object_key": obj.object_key,
-            "url": obj.url,
-            "type": obj.type,
-            "status": obj.status,
-            "meta": obj.meta,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at,
-            "updated_at": obj.updated_at,
-        }
+    return PydanticJSONResponse(
+        AssetResponse.model_validate(obj),
+        headers=validator_headers(make_etag(obj.id, obj.updated_at), obj.updated_at),
     )
 
 
@@ -142,16 +311,77 @@ async def get_download_url(
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
 ) -> dict[str, str]:
-    obj = await asset_service.get(session, asset_id)
-    if not obj:
+    object_key = await asset_service.get_object_key(session, asset_id)
+    if object_key is None:
         raise HTTPException(status_code=404, detail="Asset not found")
-    url = create_presigned_get(
+    url = await presigned_url_cache.get_url(
         bucket=settings.storage.bucket_assets,
-        object_key=obj.object_key,
+        object_key=object_key,
     )
     return {"download_url": url}
 
 
+@router.get("/assets/{asset_id}/content", response_class=StreamingResponse)
+async def download_asset_content(
+    asset_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
+) -> Response:
+    """Содержимое ассета через API — для клиентов без прямого доступа к хранилищу.
+
+    Объект отдается потоком кусками `STORAGE_PROXY_CHUNK_SIZE_BYTES`, без
+    буферизации. Поддерживаются Range (один диапазон), If-Range,
+    If-None-Match/If-Modified-Since и If-Match/If-Unmodified-Since;
+    валидаторы — ETag и Last-Modified объекта в хранилище.
+    """
+    obj = await asset_service.get(session, asset_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    bucket = settings.storage.bucket_assets
+    try:
+        stat = await stat_object(bucket=bucket, object_key=obj.object_key)
+    except S3Error as exc:
+        if exc.code in MISSING_OBJECT_CODES:
+            raise HTTPException(status_code=404, detail="Asset content not found") from exc
+        raise
+
+    etag = f'"{stat.etag}"'
+    headers = {
+        **validator_headers(etag, stat.last_modified),
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": _content_disposition(obj.filename),
+    }
+    if is_precondition_failed(request, etag, stat.last_modified):
+        return Response(status_code=status.HTTP_412_PRECONDITION_FAILED, headers=headers)
+    if is_not_modified(request, etag, stat.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    try:
+        byte_range = requested_range(request, stat.size, etag, stat.last_modified)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{stat.size}"},
+        )
+
+    status_code = status.HTTP_200_OK
+    first, last = 0, stat.size - 1
+    if byte_range is not None:
+        first, last = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {first}-{last}/{stat.size}"
+    length = last - first + 1
+    headers["Content-Length"] = str(length)
+    # length=0 у minio означает «до конца объекта» — для пустого файла это и нужно
+    response = await open_object(bucket=bucket, object_key=obj.object_key, offset=first, length=length)
+    return StreamingResponse(
+        iter_object(response, settings.storage.proxy_chunk_size_bytes),
+        status_code=status_code,
+        media_type=stat.content_type or obj.content_type,
+        headers=headers,
+    )
+
+
 @router.delete("/assets/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_asset(
     asset_id: str,
@@ -162,4 +392,5 @@ async def delete_asset(
     if not obj:
         raise HTTPException(status_code=404, detail="Asset not found")
     await asset_service.delete(session, obj)
+    await presigned_url_cache.invalidate(obj.object_key)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -2,16 +2,29 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.deps import authenticate_user, create_token_for_user
 from api.schemas.auth import TokenResponse
+from infrastructure.auth.security import PasswordHasherBusyError
+from infrastructure.db.session import get_db_session
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=TokenResponse)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()) -> TokenResponse:
-    user = await authenticate_user(form_data.username, form_data.password)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(get_db_session),
+) -> TokenResponse:
+    try:
+        user = await authenticate_user(session, form_data.username, form_data.password)
+    except PasswordHasherBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts, retry later",
+            headers={"Retry-After": "1"},
+        ) from exc
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
 
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
+from api.conditional import has_validators, is_not_modified, make_etag, validator_headers
 from api.deps import require_roles
+from api.responses import PydanticJSONResponse
+from api.schemas.common import BatchCreateRequest, parse_fields, sparse_items, validate_items
 from api.schemas.intake import (
+    BriefBatchCreateResponse,
     BriefCreateRequest,
     BriefListResponse,
     BriefResponse,
     BriefStatusUpdateRequest,
     BriefUpdateRequest,
 )
+from apps.assets.service import asset_service
 from apps.intake.models import Brief
 from apps.intake.service import intake_service
 from domain.models.user import User
+from infrastructure.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from infrastructure.db.session import get_db_session
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -26,66 +32,73 @@ async def create_brief(
     payload: BriefCreateRequest,
     session: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_CREATE)),
-) -> BriefResponse:
+) -> Response:
     """Создание нового брифа."""
     brief = await intake_service.create_brief(session, payload, current_user)
-    return BriefResponse.model_validate({
-        "id": brief.id,
-        "campaign_name": brief.campaign_name,
-        "objective": brief.objective,
-        "target_audience": brief.target_audience,
-        "launch_date": brief.launch_date,
-        "budget": brief.budget,
-        "status": brief.status,
-        "created_by": brief.created_by,
-        "created_at": brief.created_at,
-    })
+    return PydanticJSONResponse(BriefResponse.model_validate(brief), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/briefs:batch", response_model=BriefBatchCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_briefs_batch(
+    payload: BatchCreateRequest,
+    session: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_CREATE)),
+) -> Response:
+    """Пакетное создание брифов; невалидные элементы возвращаются в `errors`."""
+    valid, errors = validate_items(BriefCreateRequest, payload.items)
+    briefs = await intake_service.create_briefs(session, valid, current_user)
+    return PydanticJSONResponse(
+        BriefBatchCreateResponse(items=briefs, errors=errors), status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("/briefs", response_model=BriefListResponse)
 async def list_briefs(
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
-) -> BriefListResponse:
-    """Получить список брифов."""
-    briefs = await intake_service.list_briefs(session)
-    items = [
-        BriefResponse.model_validate({
-            "id": b.id,
-            "campaign_name": b.campaign_name,
-            "objective": b.objective,
-            "target_audience": b.target_audience,
-            "launch_date": b.launch_date,
-            "budget": b.budget,
-            "status": b.status,
-            "created_by": b.created_by,
-            "created_at": b.created_at,
-        })
-        for b in briefs
-    ]
-    return BriefListResponse(items=items)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Поля элементов через запятую; выбираются только эти колонки"),
+) -> Response:
+    """Получить страницу брифов (keyset-пагинация по `created_at, id`)."""
+    try:
+        columns = parse_fields(fields, BriefResponse)
+        page = await intake_service.list_briefs(session, limit=limit, cursor=cursor, fields=columns)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if columns is not None:
+        return PydanticJSONResponse(
+            {"items": sparse_items(page.items, columns), "limit": limit, "next_cursor": page.next_cursor}
+        )
+    return PydanticJSONResponse(
+        BriefListResponse(items=page.items, limit=limit, next_cursor=page.next_cursor)
+    )
 
 
 @router.get("/briefs/{brief_id}", response_model=BriefResponse)
 async def get_brief(
     brief_id: str,
+    request: Request,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
-) -> BriefResponse:
+) -> Response:
+    if has_validators(request):
+        probe = await intake_service.probe_brief(session, brief_id)
+        if probe is None:
+            raise HTTPException(status_code=404, detail="Brief not found")
+        etag = make_etag(brief_id, probe.updated_at, probe.version)
+        if is_not_modified(request, etag, probe.updated_at):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=validator_headers(etag, probe.updated_at),
+            )
     brief = await intake_service.get_brief(session, brief_id)
     if not brief:
         raise HTTPException(status_code=404, detail="Brief not found")
-    return BriefResponse.model_validate({
-        "id": brief.id,
-        "campaign_name": brief.campaign_name,
-        "objective": brief.objective,
-        "target_audience": brief.target_audience,
-        "launch_date": brief.launch_date,
-        "budget": brief.budget,
-        "status": brief.status,
-        "created_by": brief.created_by,
-        "created_at": brief.created_at,
-    })
+    return PydanticJSONResponse(
+        BriefResponse.model_validate(brief),
+        headers=validator_headers(make_etag(brief.id, brief.updated_at, brief.version), brief.updated_at),
+    )
 
 
 @router.patch("/briefs/{brief_id}", response_model=BriefResponse)
@@ -94,30 +107,19 @@ async def update_brief(
     payload: BriefUpdateRequest,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
-) -> BriefResponse:
-    brief = await intake_service.get_brief(session, brief_id)
-    if not brief:
-        raise HTTPException(status_code=404, detail="Brief not found")
+) -> Response:
     brief = await intake_service.update_brief(
         session,
-        brief,
+        brief_id,
         campaign_name=payload.campaign_name,
         objective=payload.objective,
         target_audience=payload.target_audience,
         launch_date=payload.launch_date,
         budget=payload.budget,
     )
-    return BriefResponse.model_validate({
-        "id": brief.id,
-        "campaign_name": brief.campaign_name,
-        "objective": brief.objective,
-        "target_audience": brief.target_audience,
-        "launch_date": brief.launch_date,
-        "budget": brief.budget,
-        "status": brief.status,
-        "created_by": brief.created_by,
-        "created_at": brief.created_at,
-    })
+    if not brief:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    return PydanticJSONResponse(BriefResponse.model_validate(brief))
 
 
 @router.patch("/briefs/{brief_id}/status", response_model=BriefResponse)
@@ -126,22 +128,11 @@ async def update_brief_status(
     payload: BriefStatusUpdateRequest,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
-) -> BriefResponse:
-    brief = await intake_service.get_brief(session, brief_id)
+) -> Response:
+    brief = await intake_service.update_brief(session, brief_id, status=payload.status)
     if not brief:
         raise HTTPException(status_code=404, detail="Brief not found")
-    brief = await intake_service.update_brief(session, brief, status=payload.status)
-    return BriefResponse.model_validate({
-        "id": brief.id,
-        "campaign_name": brief.campaign_name,
-        "objective": brief.objective,
-        "target_audience": brief.target_audience,
-        "launch_date": brief.launch_date,
-        "budget": brief.budget,
-        "status": brief.status,
-        "created_by": brief.created_by,
-        "created_at": brief.created_at,
-    })
+    return PydanticJSONResponse(BriefResponse.model_validate(brief))
 
 
 @router.delete("/briefs/{brief_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -153,5 +144,8 @@ async def delete_brief(
     brief = await intake_service.get_brief(session, brief_id)
     if not brief:
         raise HTTPException(status_code=404, detail="Brief not found")
+    removable = await asset_service.delete_brief_assets(session, brief.id)
     await intake_service.delete_brief(session, brief)
+    for object_key in removable:
+        await asset_service.remove_unreferenced(object_key)
     return None
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.conditional import has_validators, is_not_modified, make_etag, validator_headers
 from api.deps import require_roles
+from api.responses import PydanticJSONResponse
+from api.schemas.common import BatchCreateRequest, parse_fields, raw_values, sparse_items, validate_items
 from api.schemas.script import (
+    ScriptBatchCreateResponse,
     ScriptCreateRequest,
     ScriptListResponse,
     ScriptResponse,
+    ScriptSearchResponse,
     ScriptStatusUpdateRequest,
     ScriptUpdateRequest,
 )
+from apps.intake.service import intake_service
 from apps.script.service import script_service
 from domain.models.user import User
+from infrastructure.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from infrastructure.db.session import get_db_session
 
 AUTHORIZED_ROLES_CREATE = ("marketing", "producer", "admin")
@@ -27,27 +34,38 @@ async def create_script(
     payload: ScriptCreateRequest,
     session: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_CREATE)),
-) -> ScriptResponse:
-    obj = await script_service.create(
-        session,
-        brief_id=payload.brief_id,
-        title=payload.title,
-        outline=payload.outline,
-        draft_text=payload.draft_text,
-        created_by=current_user.email,
-    )
-    return ScriptResponse.model_validate(
-        {
-            "id": obj.id,
-            "brief_id": obj.brief_id,
-            "title": obj.title,
-            "outline": obj.outline,
-            "draft_text": obj.draft_text,
-            "status": obj.status,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at,
-            "updated_at": obj.updated_at,
-        }
+) -> Response:
+    try:
+        obj = await script_service.create(
+            session,
+            brief_id=payload.brief_id,
+            title=payload.title,
+            outline=payload.outline,
+            draft_text=payload.draft_text,
+            created_by=current_user.email,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return PydanticJSONResponse(ScriptResponse.model_validate(obj), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/scripts:batch", response_model=ScriptBatchCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_scripts_batch(
+    payload: BatchCreateRequest,
+    session: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_CREATE)),
+) -> Response:
+    known = await intake_service.existing_ids(session, raw_values(payload.items, "brief_id"))
+    valid, errors = validate_items(ScriptCreateRequest, payload.items, references={"brief_id": known})
+    try:
+        objs = await script_service.create_many(
+            session, [item.model_dump() for item in valid], created_by=current_user.email
+        )
+    except ValueError as exc:
+        # Бриф удален между проверкой и вставкой
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return PydanticJSONResponse(
+        ScriptBatchCreateResponse(items=objs, errors=errors), status_code=status.HTTP_201_CREATED
     )
 
 
@@ -56,48 +74,62 @@ async def list_scripts(
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
     brief_id: str | None = None,
-) -> ScriptListResponse:
-    objs = await script_service.list(session, brief_id=brief_id)
-    items = [
-        ScriptResponse.model_validate(
-            {
-                "id": o.id,
-                "brief_id": o.brief_id,
-                "title": o.title,
-                "outline": o.outline,
-                "draft_text": o.draft_text,
-                "status": o.status,
-                "created_by": o.created_by,
-                "created_at": o.created_at,
-                "updated_at": o.updated_at,
-            }
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Поля элементов через запятую; выбираются только эти колонки"),
+) -> Response:
+    try:
+        columns = parse_fields(fields, ScriptResponse)
+        page = await script_service.list(
+            session, brief_id=brief_id, limit=limit, cursor=cursor, fields=columns
         )
-        for o in objs
-    ]
-    return ScriptListResponse(items=items)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if columns is not None:
+        return PydanticJSONResponse(
+            {"items": sparse_items(page.items, columns), "limit": limit, "next_cursor": page.next_cursor}
+        )
+    return PydanticJSONResponse(
+        ScriptListResponse(items=page.items, limit=limit, next_cursor=page.next_cursor)
+    )
+
+
+@router.get("/scripts/search", response_model=ScriptSearchResponse)
+async def search_scripts(
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
+    q: str = Query(..., min_length=1, max_length=256),
+    brief_id: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+) -> Response:
+    """Полнотекстовый поиск по сценариям с ранжированием и сниппетами."""
+    hits = await script_service.search(session, q, brief_id=brief_id, limit=limit)
+    return PydanticJSONResponse(ScriptSearchResponse(items=hits))
 
 
 @router.get("/scripts/{script_id}", response_model=ScriptResponse)
 async def get_script(
     script_id: str,
+    request: Request,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
-) -> ScriptResponse:
+) -> Response:
+    if has_validators(request):
+        probe = await script_service.probe(session, script_id)
+        if probe is None:
+            raise HTTPException(status_code=404, detail="Script not found")
+        etag = make_etag(script_id, probe.updated_at)
+        if is_not_modified(request, etag, probe.updated_at):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=validator_headers(etag, probe.updated_at),
+            )
     obj = await script_service.get(session, script_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Script not found")
-    return ScriptResponse.model_validate(
-        {
-            "id": obj.id,
-            "brief_id": obj.brief_id,
-            "title": obj.title,
-            "outline": obj.outline,
-            "draft_text": obj.draft_text,
-            "status": obj.status,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at,
-            "updated_at": obj.updated_at,
-        }
+    return PydanticJSONResponse(
+        ScriptResponse.model_validate(obj),
+        headers=validator_headers(make_etag(obj.id, obj.updated_at), obj.updated_at),
     )
 
 
@@ -107,26 +139,13 @@ async def update_script(
     payload: ScriptUpdateRequest,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
-) -> ScriptResponse:
-    obj = await script_service.get(session, script_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Script not found")
+) -> Response:
     obj = await script_service.update(
-        session, obj, title=payload.title, outline=payload.outline, draft_text=payload.draft_text
-    )
-    return ScriptResponse.model_validate(
-        {
-            "id": obj.id,
-            "brief_id": obj.brief_id,
-            "title": obj.title,
-            "outline": obj.outline,
-            "draft_text": obj.draft_text,
-            "status": obj.status,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at,
-            "updated_at": obj.updated_at,
-        }
+        session, script_id, title=payload.title, outline=payload.outline, draft_text=payload.draft_text
     )
+    if not obj:
+        raise HTTPException(status_code=404, detail="Script not found")
+    return PydanticJSONResponse(ScriptResponse.model_validate(obj))
 
 
 @router.patch("/scripts/{script_id}/status", response_model=ScriptResponse)
@@ -135,24 +154,11 @@ async def update_script_status(
     payload: ScriptStatusUpdateRequest,
     session: AsyncSession = Depends(get_db_session),
     _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
-) -> ScriptResponse:
-    obj = await script_service.get(session, script_id)
+) -> Response:
+    obj = await script_service.set_status(session, script_id, status=payload.status)
     if not obj:
         raise HTTPException(status_code=404, detail="Script not found")
-    obj = await script_service.set_status(session, obj, status=payload.status)
-    return ScriptResponse.model_validate(
-        {
-            "id": obj.id,
-            "brief_id": obj.brief_id,
-            "title": obj.title,
-            "outline": obj.outline,
-            "draft_text": obj.draft_text,
-            "status": obj.status,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at,
-            "updated_at": obj.updated_at,
-        }
-    )
+    return PydanticJSONResponse(ScriptResponse.model_validate(obj))
 
 
 @router.delete("/scripts/{script_id}", status_code=status.HTTP_204_NO_CONTENT)
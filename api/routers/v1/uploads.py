@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps import require_roles
+from api.responses import PydanticJSONResponse
+from api.schemas.assets import (
+    AssetResponse,
+    UploadPartRecordRequest,
+    UploadPartResponse,
+    UploadPartURL,
+    UploadPartURLsRequest,
+    UploadPartURLsResponse,
+    UploadSessionCreateRequest,
+    UploadSessionCreateResponse,
+    UploadSessionResponse,
+    UploadSessionStatusResponse,
+)
+from apps.assets.models import UploadSession
+from apps.assets.uploads import UploadSessionError, upload_session_service
+from config.settings import settings
+from domain.models.user import User
+from infrastructure.db.session import get_db_session
+
+AUTHORIZED_ROLES_READ = ("marketing", "producer", "legal", "brand", "admin")
+AUTHORIZED_ROLES_WRITE = ("marketing", "producer", "admin")
+
+router = APIRouter()
+
+
+def _part_urls(urls: dict[int, str]) -> list[UploadPartURL]:
+    return [UploadPartURL(part_number=number, url=url) for number, url in urls.items()]
+
+
+async def _get_upload(session: AsyncSession, upload_session_id: str) -> UploadSession:
+    upload = await upload_session_service.get(session, upload_session_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload
+
+
+@router.post("/uploads", response_model=UploadSessionCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    payload: UploadSessionCreateRequest,
+    session: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    """Начинает multipart-загрузку крупного файла.
+
+    Клиент грузит части параллельно (`PUT` на URL части, ETag из ответа
+    можно отметить через `PUT /uploads/{id}/parts/{n}`), остальные URL берет
+    из `POST /uploads/{id}/part-urls`, затем вызывает `complete`.
+    """
+    try:
+        upload = await upload_session_service.create(
+            session,
+            brief_id=payload.brief_id,
+            filename=payload.filename,
+            content_type=payload.content_type,
+            type=payload.type,
+            size=payload.size,
+            part_size=payload.part_size,
+            meta=payload.meta,
+            created_by=current_user.email,
+        )
+        first = range(1, min(upload.part_count, settings.storage.multipart_urls_per_request) + 1)
+        urls = await upload_session_service.part_urls(upload, list(first))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    body = UploadSessionCreateResponse(
+        **UploadSessionResponse.model_validate(upload).model_dump(), part_urls=_part_urls(urls)
+    )
+    return PydanticJSONResponse(body, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/uploads/{upload_session_id}/part-urls", response_model=UploadPartURLsResponse)
+async def get_upload_part_urls(
+    upload_session_id: str,
+    payload: UploadPartURLsRequest,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    if len(payload.part_numbers) > settings.storage.multipart_urls_per_request:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.storage.multipart_urls_per_request} part URLs per request",
+        )
+    upload = await _get_upload(session, upload_session_id)
+    try:
+        urls = await upload_session_service.part_urls(upload, payload.part_numbers)
+    except UploadSessionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return PydanticJSONResponse(UploadPartURLsResponse(part_urls=_part_urls(urls)))
+
+
+@router.put("/uploads/{upload_session_id}/parts/{part_number}", status_code=status.HTTP_204_NO_CONTENT)
+async def record_upload_part(
+    upload_session_id: str,
+    part_number: int,
+    payload: UploadPartRecordRequest,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    upload = await _get_upload(session, upload_session_id)
+    try:
+        await upload_session_service.record_part(
+            session, upload, part_number=part_number, etag=payload.etag, size=payload.size
+        )
+    except UploadSessionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/uploads/{upload_session_id}", response_model=UploadSessionStatusResponse)
+async def get_upload_session(
+    upload_session_id: str,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_READ)),
+) -> Response:
+    """Состояние сессии и отмеченные клиентом части — для возобновления загрузки."""
+    upload = await _get_upload(session, upload_session_id)
+    parts = await upload_session_service.list_parts(session, upload)
+    body = UploadSessionStatusResponse(
+        **UploadSessionResponse.model_validate(upload).model_dump(),
+        parts=[UploadPartResponse.model_validate(part) for part in parts],
+    )
+    return PydanticJSONResponse(body)
+
+
+@router.post(
+    "/uploads/{upload_session_id}/complete", response_model=AssetResponse, status_code=status.HTTP_201_CREATED
+)
+async def complete_upload_session(
+    upload_session_id: str,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    upload = await _get_upload(session, upload_session_id)
+    try:
+        asset = await upload_session_service.complete(session, upload)
+    except UploadSessionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return PydanticJSONResponse(AssetResponse.model_validate(asset), status_code=status.HTTP_201_CREATED)
+
+
+@router.delete("/uploads/{upload_session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    upload_session_id: str,
+    session: AsyncSession = Depends(get_db_session),
+    _: User = Depends(require_roles(*AUTHORIZED_ROLES_WRITE)),
+) -> Response:
+    upload = await _get_upload(session, upload_session_id)
+    try:
+        await upload_session_service.abort(session, upload)
+    except UploadSessionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
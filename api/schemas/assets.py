@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from api.schemas.common import BatchItemError
+
+# Съемка — до нескольких тысяч файлов; подпись дешевая, поэтому лимит выше MAX_BATCH_SIZE
+MAX_UPLOAD_URL_BATCH_SIZE = 5000
+
+SHA256_PATTERN = r"^[0-9a-fA-F]{64}$"
 
 
 class AssetUploadURLRequest(BaseModel):
@@ -12,24 +19,61 @@ class AssetUploadURLRequest(BaseModel):
     content_type: str = Field(..., max_length=128)
     type: Literal["image", "audio", "video", "doc"]
     size: int | None = Field(default=None, ge=0)
+    sha256: str | None = Field(
+        default=None, pattern=SHA256_PATTERN, description="SHA-256 содержимого; известный файл не грузится повторно"
+    )
 
 
 class AssetUploadURLResponse(BaseModel):
     object_key: str
-    upload_url: str
+    # None, если такой файл уже есть: его `object_key` сразу передается в attach
+    upload_url: str | None
+    exists: bool = False
+
+
+class AssetUploadURLBatchRequest(BaseModel):
+    """Элементы — `AssetUploadURLRequest`; проверяются по одному, как в других пакетных методах."""
+
+    items: list[dict[str, Any]] = Field(..., min_length=1, max_length=MAX_UPLOAD_URL_BATCH_SIZE)
+
+
+class AssetUploadURLBatchItem(AssetUploadURLResponse):
+    # Позиция элемента в запросе: по ней клиент сопоставляет URL с файлом
+    index: int
+
+
+class AssetUploadURLBatchResponse(BaseModel):
+    items: list[AssetUploadURLBatchItem]
+    errors: list[BatchItemError]
+    expires_in: int
 
 
 class AssetAttachRequest(BaseModel):
     brief_id: str
-    object_key: str
+    object_key: str = Field(..., max_length=512)
     filename: str
     content_type: str
     type: Literal["image", "audio", "video", "doc"]
     size: int | None = Field(default=None, ge=0)
     meta: dict | None = None
+    sha256: str | None = Field(default=None, pattern=SHA256_PATTERN)
+
+    @field_validator("object_key")
+    @classmethod
+    def _storage_key(cls, value: str) -> str:
+        # Те же правила, что у клиента хранилища: иначе stat при проверке падал бы на каждом проходе
+        if not value.strip():
+            raise ValueError("object_key must not be blank")
+        if any(segment in (".", "..") for segment in value.split("/")):
+            raise ValueError("object_key must not contain '.' or '..' segments")
+        if any(ord(ch) < 0x20 or ord(ch) == 0x7F for ch in value):
+            raise ValueError("object_key must not contain control characters")
+        return value
 
 
 class AssetResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     brief_id: str
     filename: str
@@ -37,6 +81,8 @@ class AssetResponse(BaseModel):
     size: int | None
     object_key: str
     url: str | None
+    etag: str | None
+    content_hash: str | None
     type: str
     status: str
     meta: dict | None
@@ -47,3 +93,75 @@ class AssetResponse(BaseModel):
 
 class AssetListResponse(BaseModel):
     items: list[AssetResponse]
+    limit: int
+    next_cursor: str | None = None
+
+
+class AssetBatchAttachResponse(BaseModel):
+    items: list[AssetResponse]
+    errors: list[BatchItemError]
+
+
+class UploadSessionCreateRequest(BaseModel):
+    brief_id: str
+    filename: str = Field(..., max_length=255)
+    content_type: str = Field(..., max_length=128)
+    type: Literal["image", "audio", "video", "doc"]
+    size: int = Field(..., gt=0, le=5 * 1024**4, description="Полный размер объекта в байтах")
+    part_size: int | None = Field(
+        default=None, ge=5 * 1024**2, le=5 * 1024**3, description="Желаемый размер части; по умолчанию из настроек"
+    )
+    meta: dict | None = None
+
+
+class UploadPartURL(BaseModel):
+    part_number: int
+    url: str
+
+
+class UploadPartResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    part_number: int
+    etag: str
+    size: int | None
+
+
+class UploadSessionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    brief_id: str
+    object_key: str
+    filename: str
+    content_type: str
+    type: str
+    size: int
+    part_size: int
+    part_count: int
+    status: str
+    asset_id: str | None
+    expires_at: datetime
+    created_at: datetime
+
+
+class UploadSessionCreateResponse(UploadSessionResponse):
+    # URL первых частей, чтобы клиент мог начать загрузку без второго запроса
+    part_urls: list[UploadPartURL]
+
+
+class UploadSessionStatusResponse(UploadSessionResponse):
+    parts: list[UploadPartResponse]
+
+
+class UploadPartURLsRequest(BaseModel):
+    part_numbers: list[int] = Field(..., min_length=1, max_length=10_000)
+
+
+class UploadPartURLsResponse(BaseModel):
+    part_urls: list[UploadPartURL]
+
+
+class UploadPartRecordRequest(BaseModel):
+    etag: str = Field(..., min_length=1, max_length=128)
+    size: int | None = Field(default=None, ge=0)
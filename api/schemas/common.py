@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections.abc import Container, Mapping
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+MAX_BATCH_SIZE = 1000
+
+
+class BatchItemError(BaseModel):
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class BatchCreateRequest(BaseModel):
+    """Элементы проверяются по одному, чтобы ошибка в одном не отклоняла весь пакет."""
+
+    items: list[dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+def validate_items(
+    model: type[M],
+    items: list[dict[str, Any]],
+    *,
+    references: Mapping[str, Container[str]] | None = None,
+) -> tuple[list[M], list[BatchItemError]]:
+    """`references` — допустимые значения полей-ссылок (например, существующие `brief_id`).
+
+    Элемент со ссылкой на несуществующую запись попадает в ошибки, а не валит
+    весь пакет нарушением внешнего ключа.
+    """
+    valid: list[M] = []
+    errors: list[BatchItemError] = []
+    for index, raw in enumerate(items):
+        try:
+            item = model.model_validate(raw)
+        except ValidationError as exc:
+            errors.append(
+                BatchItemError(
+                    index=index,
+                    errors=exc.errors(include_url=False, include_context=False, include_input=False),
+                )
+            )
+            continue
+        missing = [name for name, known in (references or {}).items() if getattr(item, name) not in known]
+        if missing:
+            errors.append(
+                BatchItemError(
+                    index=index,
+                    errors=[{"type": "not_found", "loc": [name], "msg": "Referenced record not found"} for name in missing],
+                )
+            )
+            continue
+        valid.append(item)
+    return valid, errors
+
+
+def raw_values(items: list[dict[str, Any]], field: str) -> set[str]:
+    """Строковые значения поля из еще не проверенных элементов пакета."""
+    return {raw[field] for raw in items if isinstance(raw.get(field), str)}
+
+
+def parse_fields(raw: str | None, model: type[BaseModel]) -> list[str] | None:
+    """Разбирает `fields=a,b,c`; неизвестные поля — ValueError."""
+    if raw is None:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in model.model_fields]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}" if unknown else "Empty fields")
+    return fields
+
+
+def sparse_items(rows: list[Any], fields: list[str]) -> list[dict[str, Any]]:
+    return [{name: row._mapping[name] for name in fields} for row in rows]
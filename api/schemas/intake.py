@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from api.schemas.common import BatchItemError
 
 
 class BriefCreateRequest(BaseModel):
@@ -13,6 +15,8 @@ class BriefCreateRequest(BaseModel):
 
 
 class BriefResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     campaign_name: str
     objective: str
@@ -22,10 +26,19 @@ class BriefResponse(BaseModel):
     status: str
     created_by: str
     created_at: datetime
+    updated_at: datetime
+    version: int
 
 
 class BriefListResponse(BaseModel):
     items: list[BriefResponse]
+    limit: int
+    next_cursor: str | None = None
+
+
+class BriefBatchCreateResponse(BaseModel):
+    items: list[BriefResponse]
+    errors: list[BatchItemError]
 
 
 class BriefUpdateRequest(BaseModel):
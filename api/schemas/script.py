@@ -3,7 +3,9 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from api.schemas.common import BatchItemError
 
 
 class ScriptCreateRequest(BaseModel):
@@ -24,6 +26,8 @@ class ScriptStatusUpdateRequest(BaseModel):
 
 
 class ScriptResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     brief_id: str
     title: str
@@ -37,3 +41,27 @@ class ScriptResponse(BaseModel):
 
 class ScriptListResponse(BaseModel):
     items: list[ScriptResponse]
+    limit: int
+    next_cursor: str | None = None
+
+
+class ScriptBatchCreateResponse(BaseModel):
+    items: list[ScriptResponse]
+    errors: list[BatchItemError]
+
+
+class ScriptSearchHitResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    brief_id: str
+    title: str
+    status: str
+    rank: float
+    snippet: str | None = Field(
+        None, description="Фрагмент с совпадениями: HTML-экранированный текст, совпадения в <b>"
+    )
+
+
+class ScriptSearchResponse(BaseModel):
+    items: list[ScriptSearchHitResponse]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, bindparam, exists, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from apps.assets.models import Asset, meta_path
+
+META_PARAM_PREFIX = "meta."
+MAX_META_FILTERS = 10
+OPERATORS = ("eq", "lt", "lte", "gt", "gte", "contains")
+
+_PARAM_RE = re.compile(r"^meta\.([A-Za-z_][A-Za-z0-9_]{0,63})(?:\[(\w+)\])?$")
+_RANGE_OPS = {"lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+
+@dataclass(frozen=True, slots=True)
+class MetaFilter:
+    key: str
+    op: str
+    value: Any
+
+
+def _parse_value(raw: str) -> Any:
+    # `15` и `true` сравниваются как числа/булевы, `9:16` и даты — как строки
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return raw
+    return value if isinstance(value, (int, float, bool, str)) else raw
+
+
+def parse_meta_filters(params: Iterable[tuple[str, str]]) -> list[MetaFilter]:
+    """Фильтры из query-параметров `meta.<key>[<op>]=<value>`.
+
+    Без `[op]` — равенство. Неизвестный оператор или ключ — ValueError.
+    """
+    filters: list[MetaFilter] = []
+    for name, raw in params:
+        if not name.startswith(META_PARAM_PREFIX):
+            continue
+        match = _PARAM_RE.match(name)
+        if match is None:
+            raise ValueError(f"Invalid meta filter: {name}")
+        key, op = match.group(1), match.group(2) or "eq"
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown meta filter operator: {op}")
+        value = _parse_value(raw)
+        if op in _RANGE_OPS and (isinstance(value, bool) or not isinstance(value, (int, float, str))):
+            raise ValueError(f"Range filter on meta.{key} needs a number or a string")
+        filters.append(MetaFilter(key=key, op=op, value=value))
+    if len(filters) > MAX_META_FILTERS:
+        raise ValueError(f"Too many meta filters (max {MAX_META_FILTERS})")
+    return filters
+
+
+def meta_conditions(filters: Sequence[MetaFilter], dialect: str) -> list[ColumnElement[bool]]:
+    """WHERE-условия под индексы `Asset`: GIN/выражения в Postgres, json_extract в SQLite."""
+    if dialect == "postgresql":
+        return _postgres_conditions(filters)
+    return [_sqlite_condition(f) for f in filters]
+
+
+def _json_kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    return "number" if isinstance(value, (int, float)) else "string"
+
+
+def _postgres_conditions(filters: Sequence[MetaFilter]) -> list[ColumnElement[bool]]:
+    conditions: list[ColumnElement[bool]] = []
+    # Равенства и вхождения сливаются в один `meta @> {...}` — один проход по GIN
+    document: dict[str, Any] = {}
+    for f in filters:
+        if f.op in ("eq", "contains"):
+            fragment = f.value if f.op == "eq" else [f.value]
+            current = document.setdefault(f.key, fragment)
+            if current is fragment:
+                continue
+            if f.op == "contains" and isinstance(current, list):
+                current.append(f.value)
+            else:
+                # Ключ уже занят несовместимым условием — проверяем отдельно
+                conditions.append(Asset.meta.op("@>")(bindparam(None, {f.key: fragment}, type_=JSONB)))
+        else:
+            path = meta_path(f.key, "postgresql")
+            # jsonb сравнивает значения разных типов по порядку типов,
+            # поэтому без проверки типа строки попали бы в диапазон чисел.
+            conditions.append(
+                and_(
+                    path.op(_RANGE_OPS[f.op])(bindparam(None, f.value, type_=JSONB)),
+                    func.jsonb_typeof(path) == _json_kind(f.value),
+                )
+            )
+    if document:
+        conditions.insert(0, Asset.meta.op("@>")(bindparam(None, document, type_=JSONB)))
+    return conditions
+
+
+def _sqlite_condition(f: MetaFilter) -> ColumnElement[bool]:
+    path = meta_path(f.key, "sqlite")
+    if f.op == "eq":
+        return path == f.value
+    if f.op == "contains":
+        each = func.json_each(Asset.__table__.c.meta, text(f"'$.{f.key}'")).table_valued("value")
+        return and_(
+            func.json_type(Asset.__table__.c.meta, text(f"'$.{f.key}'")) == "array",
+            exists(select(literal_column("1")).select_from(each).where(each.c.value == f.value)),
+        )
+    kind = ("integer", "real") if _json_kind(f.value) == "number" else ("text",)
+    return and_(
+        path.op(_RANGE_OPS[f.op])(f.value),
+        func.json_type(Asset.__table__.c.meta, text(f"'$.{f.key}'")).in_(kind),
+    )
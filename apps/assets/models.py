@@ -3,7 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import JSON, DateTime, Integer, String, Text, func
+from sqlalchemy import JSON, BigInteger, ColumnElement, DateTime, ForeignKey, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from infrastructure.db.base import Base
@@ -12,23 +13,128 @@ from infrastructure.db.base import Base
 class Asset(Base):
     """Digital asset stored in S3-compatible storage and referenced in DB."""
 
+    __table_args__ = (
+        Index("ix_asset_brief_id_created_at", "brief_id", "created_at"),
+        Index("ix_asset_status_created_at", "status", "created_at"),
+        Index("ix_asset_content_hash", "content_hash"),
+    )
+
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
-    brief_id: Mapped[str] = mapped_column(String, nullable=False)
+    brief_id: Mapped[str] = mapped_column(String, ForeignKey("brief.id", ondelete="CASCADE", name="fk_asset_brief_id_brief"), nullable=False)
 
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     content_type: Mapped[str] = mapped_column(String(128), nullable=False)
-    size: Mapped[int] = mapped_column(Integer, nullable=True)
+    size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     # s3 object key and public URL (if any)
     object_key: Mapped[str] = mapped_column(String(512), nullable=False)
     url: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # ETag объекта в хранилище; заполняется при проверке
+    etag: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # Хеш содержимого для дедупликации: `sha256:<hex>` или `s3-etag:<etag>` (multipart)
+    content_hash: Mapped[str | None] = mapped_column(String(160), nullable=True)
+
     # image/audio/video/doc
     type: Mapped[str] = mapped_column(String(32), nullable=False)
+    # uploaded -> verified | missing | failed (см. apps.assets.verification)
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="uploaded")
+    # Неудачные проверки в хранилище; после STORAGE_VERIFY_MAX_ATTEMPTS ассет получает `failed`
+    verify_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Проверка взяла ассет в работу до этого момента; после — его может забрать другая реплика
+    verify_claimed_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    meta: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+
+    created_by: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+
+
+class StoredObject(Base):
+    """Физический объект в хранилище и число ассетов, которые на него ссылаются.
+
+    Одинаковое содержимое хранится один раз: несколько `Asset` могут указывать
+    на один `object_key`; объект удаляется, когда счетчик доходит до нуля.
+    """
+
+    object_key: Mapped[str] = mapped_column(String(512), primary_key=True)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
+
+
+class UploadSession(Base):
+    """Незавершенная multipart-загрузка объекта в S3; по завершении создается `Asset`."""
+
+    __table_args__ = (Index("ix_uploadsession_status_expires_at", "status", "expires_at"),)
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
+    brief_id: Mapped[str] = mapped_column(
+        String, ForeignKey("brief.id", ondelete="CASCADE", name="fk_uploadsession_brief_id_brief"), nullable=False
+    )
+    object_key: Mapped[str] = mapped_column(String(512), nullable=False)
+    upload_id: Mapped[str] = mapped_column(String(1024), nullable=False)
+
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    type: Mapped[str] = mapped_column(String(32), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    part_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    part_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    meta: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
 
-    meta: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # active/completing/completed/aborted/expired
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="active")
+    asset_id: Mapped[str | None] = mapped_column(String, nullable=True)
 
     created_by: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class UploadPart(Base):
+    """Часть, о загрузке которой сообщил клиент. Отдельные строки, а не JSON
+    в сессии: части отмечаются параллельно и не должны перетирать друг друга."""
+
+    session_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("uploadsession.id", ondelete="CASCADE", name="fk_uploadpart_session_id_uploadsession"),
+        primary_key=True,
+    )
+    part_number: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    etag: Mapped[str] = mapped_column(String(128), nullable=False)
+    size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
+
+# Ключи meta с индексом по выражению (brief_id, значение ключа). В Postgres
+# равенство и вхождение обслуживает GIN, поэтому там индексируются только
+# ключи для диапазонных фильтров.
+META_RANGE_KEYS = ("duration", "rights_expiry")
+META_INDEXED_KEYS = ("duration", "aspect_ratio", "resolution", "codec", "locale", "rights_expiry")
+
+
+def meta_path(key: str, dialect: str) -> ColumnElement:
+    """Значение ключа `meta` в том же виде, что и в индексах.
+
+    Ключ встраивается литералом: планировщик сопоставляет индекс по выражению
+    только с константой, не с параметром. `key` должен быть проверен заранее.
+    """
+    column = Asset.__table__.c.meta
+    if dialect == "postgresql":
+        return column.op("->")(text(f"'{key}'"))
+    return func.json_extract(column, text(f"'$.{key}'"))
+
+
+Index(
+    "ix_asset_meta",
+    Asset.__table__.c.meta,
+    postgresql_using="gin",
+    postgresql_ops={"meta": "jsonb_path_ops"},
+).ddl_if(dialect="postgresql")
+for _key in META_RANGE_KEYS:
+    Index(f"ix_asset_meta_{_key}_pg", Asset.__table__.c.brief_id, meta_path(_key, "postgresql")).ddl_if(
+        dialect="postgresql"
+    )
+for _key in META_INDEXED_KEYS:
+    Index(f"ix_asset_meta_{_key}", Asset.__table__.c.brief_id, meta_path(_key, "sqlite")).ddl_if(dialect="sqlite")
@@ -1,9 +1,56 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections import Counter
+from collections.abc import Collection, Iterable, Sequence
+from uuid import uuid4
+
+from minio.error import S3Error
+from sqlalchemy import Row, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from urllib3.exceptions import HTTPError
+
+from apps.assets.meta_filters import MetaFilter, meta_conditions
+from apps.assets.models import Asset, StoredObject
+from apps.intake.service import brief_reference
+from config.logging import get_logger
+from config.settings import settings
+from infrastructure.db.pagination import Page, paginate, select_columns
+from infrastructure.storage.minio_client import remove_object
+
+logger = get_logger(__name__)
+
+# Ключи `meta` с производными объектами ассета (заполняет медиапайплайн)
+DERIVED_META_KEYS = ("thumbnail_key", "proxy_key")
+
+
+def new_object_key(brief_id: str, filename: str) -> str:
+    """Ключ объекта для новой загрузки; uuid-префикс исключает коллизии имен файлов."""
+    return f"briefs/{brief_id}/{uuid4()}_{filename}"
+
+
+# Хеши, посчитанные сервером или хранилищем по самим байтам; только по ним
+# ищутся дубликаты. Хеш от клиента хранится с префиксом `sha256-claimed:`
+# и ни с чем не сопоставляется: иначе клиент мог бы подписать чужим хешем
+# другой объект, и следующие загрузчики получили бы ссылку на чужие байты.
+TRUSTED_HASH_PREFIXES = ("sha256:", "s3-etag:")
+
+
+def sha256_content_hash(hexdigest: str | None) -> str | None:
+    """Хеш, посчитанный сервером (потоковая загрузка)."""
+    return f"sha256:{hexdigest.lower()}" if hexdigest else None
+
 
-from apps.assets.models import Asset
+def claimed_sha256_hash(hexdigest: str | None) -> str | None:
+    """SHA-256 со слов клиента: сохраняется, но в дедупликации не участвует."""
+    return f"sha256-claimed:{hexdigest.lower()}" if hexdigest else None
+
+
+def etag_content_hash(etag: str | None) -> str | None:
+    """Хеш по ETag multipart-объекта: совпадает у одинакового содержимого,
+    нарезанного на одинаковые части (размер части выбирается детерминированно)."""
+    etag = (etag or "").strip('"')
+    return f"s3-etag:{etag}" if etag else None
 
 
 class AssetServiceDB:
@@ -19,7 +66,15 @@ class AssetServiceDB:
         type: str,
         created_by: str,
         meta: dict | None = None,
+        content_hash: str | None = None,
+        etag: str | None = None,
+        status: str = "uploaded",
+        object_acquired: bool = False,
     ) -> Asset:
+        """`status="verified"` — объект уже сверен сервером (размер и хеш посчитаны при загрузке).
+
+        `object_acquired` — ссылку на объект вызывающий уже взял в этой транзакции (`acquire_existing`).
+        """
         obj = Asset(
             brief_id=brief_id,
             object_key=object_key,
@@ -29,25 +84,182 @@ class AssetServiceDB:
             type=type,
             created_by=created_by,
             meta=meta,
+            content_hash=content_hash,
+            etag=etag,
+            status=status,
         )
         session.add(obj)
-        await session.commit()
+        async with brief_reference(session):
+            if not object_acquired:
+                await self.acquire_objects(session, [object_key])
+            await session.commit()
         await session.refresh(obj)
         return obj
 
-    async def list(self, session: AsyncSession, *, brief_id: str | None = None) -> list[Asset]:
-        stmt = select(Asset).order_by(Asset.created_at.desc())
+    async def attach_many(self, session: AsyncSession, items: list[dict], *, created_by: str) -> list[Asset]:
+        """Пакетная регистрация одним multi-row INSERT ... RETURNING в одной транзакции.
+
+        `items` — словари с аргументами `attach` (кроме `created_by`).
+        """
+        if not items:
+            return []
+        rows = [{**item, "created_by": created_by} for item in items]
+        async with brief_reference(session):
+            res = await session.scalars(insert(Asset).returning(Asset, sort_by_parameter_order=True), rows)
+            objs = list(res.all())
+            await self.acquire_objects(session, [row["object_key"] for row in rows])
+        await session.commit()
+        return objs
+
+    async def find_duplicates(self, session: AsyncSession, content_hashes: Collection[str]) -> dict[str, Row]:
+        """Проверенные объекты с такими хешами: хеш -> строка (`object_key`, `size`, `etag`).
+
+        Учитываются только хеши из TRUSTED_HASH_PREFIXES.
+        """
+        content_hashes = {h for h in content_hashes if h.startswith(TRUSTED_HASH_PREFIXES)}
+        if not content_hashes:
+            return {}
+        res = await session.execute(
+            select(Asset.content_hash, Asset.object_key, Asset.size, Asset.etag).where(
+                Asset.content_hash.in_(content_hashes), Asset.status == "verified"
+            )
+        )
+        found: dict[str, Row] = {}
+        for row in res.all():
+            found.setdefault(row.content_hash, row)
+        return found
+
+    async def acquire_objects(self, session: AsyncSession, object_keys: Iterable[str]) -> None:
+        """Увеличивает счетчики ссылок на объекты (в текущей транзакции, без commit)."""
+        counts = Counter(object_keys)
+        if not counts:
+            return
+        dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(StoredObject).values(
+            [{"object_key": key, "ref_count": count} for key, count in counts.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StoredObject.object_key],
+            set_={"ref_count": StoredObject.ref_count + stmt.excluded.ref_count},
+        )
+        await session.execute(stmt)
+
+    async def acquire_existing(self, session: AsyncSession, object_key: str) -> bool:
+        """Ссылка на уже хранящийся объект (в текущей транзакции, без commit).
+
+        Счетчик растет, только пока он положителен: False — последнюю ссылку
+        уже освободили, и объект удален или вот-вот будет удален.
+        """
+        acquired = await session.scalar(
+            update(StoredObject)
+            .where(StoredObject.object_key == object_key, StoredObject.ref_count > 0)
+            .values(ref_count=StoredObject.ref_count + 1)
+            .returning(StoredObject.object_key)
+        )
+        return acquired is not None
+
+    async def release_object(self, session: AsyncSession, object_key: str, count: int = 1) -> bool:
+        """Уменьшает счетчик ссылок на `count`; True — ссылок не осталось и объект можно удалять.
+
+        Объекты без записи (зарегистрированные до учета ссылок) не удаляются.
+        """
+        remaining = await session.scalar(
+            update(StoredObject)
+            .where(StoredObject.object_key == object_key)
+            .values(ref_count=StoredObject.ref_count - count)
+            .returning(StoredObject.ref_count)
+        )
+        if remaining is None or remaining > 0:
+            return False
+        # Условие по счетчику: параллельный attach мог успеть снова сослаться на объект
+        res = await session.execute(
+            delete(StoredObject).where(StoredObject.object_key == object_key, StoredObject.ref_count <= 0)
+        )
+        return res.rowcount == 1
+
+    async def remove_unreferenced(self, object_key: str) -> None:
+        """Удаляет объект без ссылок; строка в БД уже удалена, поэтому ошибка хранилища только логируется."""
+        try:
+            await remove_object(bucket=settings.storage.bucket_assets, object_key=object_key)
+        except (S3Error, HTTPError) as exc:
+            logger.warning("object_remove_failed", object_key=object_key, error=str(exc))
+
+    async def list(
+        self,
+        session: AsyncSession,
+        *,
+        brief_id: str | None = None,
+        limit: int,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+        meta_filters: Sequence[MetaFilter] | None = None,
+    ) -> Page[Asset] | Page[Row]:
+        """С `fields` выбираются только эти колонки, элементы страницы — `Row`.
+
+        `meta_filters` компилируются в условия под индексы по `meta` текущего диалекта.
+        """
+        stmt = select(Asset) if fields is None else select_columns(Asset, fields)
         if brief_id:
             stmt = stmt.where(Asset.brief_id == brief_id)
-        res = await session.execute(stmt)
-        return list(res.scalars().all())
+        if meta_filters:
+            stmt = stmt.where(*meta_conditions(meta_filters, session.get_bind().dialect.name))
+        return await paginate(session, stmt, Asset, limit=limit, cursor=cursor, rows=fields is not None)
 
     async def get(self, session: AsyncSession, asset_id: str) -> Asset | None:
         return await session.get(Asset, asset_id)
 
+    async def probe(self, session: AsyncSession, asset_id: str) -> Row | None:
+        """Только `updated_at` по первичному ключу — для условных запросов."""
+        res = await session.execute(select(Asset.updated_at).where(Asset.id == asset_id))
+        return res.first()
+
+    async def get_object_key(self, session: AsyncSession, asset_id: str) -> str | None:
+        """Только ключ объекта, без загрузки всей строки."""
+        return await session.scalar(select(Asset.object_key).where(Asset.id == asset_id))
+
+    async def merge_meta(self, session: AsyncSession, asset_id: str, values: dict) -> bool:
+        """Дописывает ключи в `meta` под блокировкой строки; False — ассета нет."""
+        obj = await session.get(Asset, asset_id, with_for_update=True)
+        if obj is None:
+            await session.rollback()
+            return False
+        obj.meta = {**(obj.meta or {}), **values}
+        await session.commit()
+        return True
+
     async def delete(self, session: AsyncSession, obj: Asset) -> None:
+        """Удаляет ассет; объект в хранилище — только если на него больше никто не ссылается.
+
+        Ассеты брифа при его удалении освобождает `delete_brief_assets`.
+        """
         await session.delete(obj)
+        unreferenced = await self.release_object(session, obj.object_key)
         await session.commit()
+        if unreferenced:
+            await self.remove_unreferenced(obj.object_key)
+        # Превью и прокси из медиапайплайна принадлежат только этому ассету
+        for key in DERIVED_META_KEYS:
+            if obj.meta and obj.meta.get(key):
+                await self.remove_unreferenced(obj.meta[key])
+
+    async def delete_brief_assets(self, session: AsyncSession, brief_id: str) -> list[str]:
+        """Удаляет ассеты брифа и освобождает их объекты в текущей транзакции (без commit).
+
+        Вызывается перед удалением брифа: каскад в БД счетчики ссылок не
+        уменьшает. Возвращает ключи, которые после commit нужно удалить из
+        хранилища (объекты без ссылок и производные объекты ассетов).
+        """
+        res = await session.execute(
+            delete(Asset).where(Asset.brief_id == brief_id).returning(Asset.object_key, Asset.meta)
+        )
+        rows = res.all()
+        removable = [
+            object_key
+            for object_key, count in Counter(row.object_key for row in rows).items()
+            if await self.release_object(session, object_key, count)
+        ]
+        removable.extend(row.meta[key] for row in rows for key in DERIVED_META_KEYS if row.meta and row.meta.get(key))
+        return removable
 
 
 asset_service = AssetServiceDB()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+
+from minio.datatypes import Part
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.assets.models import Asset
+from apps.assets.service import asset_service, new_object_key, sha256_content_hash
+from config.settings import settings
+from infrastructure.storage.minio_client import (
+    MAX_MULTIPART_PARTS,
+    abort_multipart_upload,
+    complete_multipart_upload,
+    create_multipart_upload,
+    put_object_bytes,
+    run_blocking,
+    upload_part,
+)
+
+
+class ObjectTooLarge(ValueError):
+    """Поток не помещается в MAX_MULTIPART_PARTS частей."""
+
+
+@dataclass(slots=True)
+class StreamedObject:
+    size: int
+    sha256: str
+    etag: str | None
+
+
+async def stream_to_storage(
+    chunks: AsyncIterable[bytes], *, bucket: str, object_key: str, content_type: str
+) -> StreamedObject:
+    """Перекладывает поток в хранилище, считая размер и SHA-256 по ходу.
+
+    Куски копятся до `STORAGE_STREAM_UPLOAD_PART_SIZE_BYTES` и уходят частями
+    multipart-загрузки; пока части отправляются, читается следующая. В полете
+    не больше `STORAGE_STREAM_UPLOAD_PARALLEL_PARTS` частей — дальше поток
+    не читается, и клиент упирается в TCP backpressure. Поток меньше одной
+    части сохраняется одним PUT. При любой ошибке загрузка прерывается.
+    """
+    part_size = settings.storage.stream_upload_part_size_bytes
+    slots = asyncio.Semaphore(settings.storage.stream_upload_parallel_parts)
+    hasher = hashlib.sha256()
+    pending: list[bytes] = []
+    pending_size = size = 0
+    upload_id: str | None = None
+    uploads: list[asyncio.Task[Part]] = []
+    failures: list[BaseException] = []
+
+    async def send(part_number: int, data: bytes) -> Part:
+        try:
+            return await upload_part(
+                bucket=bucket, object_key=object_key, upload_id=upload_id, part_number=part_number, data=data
+            )
+        finally:
+            slots.release()
+
+    def on_done(task: asyncio.Task[Part]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            failures.append(task.exception())
+
+    async def flush() -> bytes:
+        nonlocal pending_size
+        # Части S3 могут быть разного размера, поэтому буфер не режется точно
+        # по part_size: одна склейка вместо повторного копирования хвоста
+        data = b"".join(pending)
+        pending.clear()
+        pending_size = 0
+        # hashlib отпускает GIL на крупных буферах — хеш не занимает event loop
+        await run_blocking(hasher.update, data)
+        return data
+
+    async def dispatch(data: bytes) -> None:
+        nonlocal upload_id
+        if len(uploads) >= MAX_MULTIPART_PARTS:
+            raise ObjectTooLarge("Object is too large for a streamed upload")
+        if upload_id is None:
+            upload_id = await create_multipart_upload(bucket=bucket, object_key=object_key, content_type=content_type)
+        await slots.acquire()
+        if failures:
+            slots.release()
+            raise failures[0]
+        task = asyncio.create_task(send(len(uploads) + 1, data))
+        task.add_done_callback(on_done)
+        uploads.append(task)
+
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            pending.append(chunk)
+            pending_size += len(chunk)
+            size += len(chunk)
+            if pending_size >= part_size:
+                await dispatch(await flush())
+        tail = await flush()
+        if upload_id is None:
+            etag = await put_object_bytes(bucket=bucket, object_key=object_key, data=tail, content_type=content_type)
+            return StreamedObject(size=size, sha256=hasher.hexdigest(), etag=(etag or "").strip('"') or None)
+        if tail:
+            await dispatch(tail)
+        parts = await asyncio.gather(*uploads)
+        etag = await complete_multipart_upload(
+            bucket=bucket, object_key=object_key, upload_id=upload_id, parts=list(parts)
+        )
+    except BaseException:
+        for task in uploads:
+            task.cancel()
+        await asyncio.gather(*uploads, return_exceptions=True)
+        if upload_id is not None:
+            await abort_multipart_upload(bucket=bucket, object_key=object_key, upload_id=upload_id)
+        raise
+    return StreamedObject(size=size, sha256=hasher.hexdigest(), etag=(etag or "").strip('"') or None)
+
+
+async def upload_stream(
+    session: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    *,
+    brief_id: str,
+    filename: str,
+    content_type: str,
+    type: str,
+    meta: dict | None,
+    created_by: str,
+) -> Asset:
+    """Загружает поток в хранилище и регистрирует ассет сразу проверенным.
+
+    Если объект с тем же SHA-256 и размером уже хранится и на него удалось
+    взять ссылку, ассет ссылается на него, а только что загруженная копия
+    удаляется. Дубликат, последнюю ссылку на который успели освободить,
+    не используется: ассет остается на своей копии.
+    """
+    uploaded_key = new_object_key(brief_id, filename)
+    stored = await stream_to_storage(
+        chunks, bucket=settings.storage.bucket_assets, object_key=uploaded_key, content_type=content_type
+    )
+    content_hash = sha256_content_hash(stored.sha256)
+    object_key, etag = uploaded_key, stored.etag
+    duplicate = (await asset_service.find_duplicates(session, [content_hash])).get(content_hash)
+    if (
+        duplicate is not None
+        and duplicate.size == stored.size
+        and await asset_service.acquire_existing(session, duplicate.object_key)
+    ):
+        object_key, etag = duplicate.object_key, duplicate.etag
+    try:
+        obj = await asset_service.attach(
+            session,
+            brief_id=brief_id,
+            object_key=object_key,
+            filename=filename,
+            content_type=content_type,
+            size=stored.size,
+            type=type,
+            created_by=created_by,
+            meta=meta,
+            content_hash=content_hash,
+            etag=etag,
+            status="verified",
+            object_acquired=object_key != uploaded_key,
+        )
+    except ValueError:
+        # Бриф удален, пока шла загрузка: объект никому не нужен
+        await asset_service.remove_unreferenced(uploaded_key)
+        raise
+    if object_key != uploaded_key:
+        await asset_service.remove_unreferenced(uploaded_key)
+    return obj
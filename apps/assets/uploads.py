@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from minio.error import S3Error
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from urllib3.exceptions import HTTPError
+
+from apps.assets.models import Asset, UploadPart, UploadSession
+from apps.assets.service import asset_service, etag_content_hash, new_object_key
+from apps.intake.service import brief_reference
+from config.logging import get_logger
+from config.settings import settings
+from infrastructure.storage.minio_client import (
+    MAX_MULTIPART_PARTS,
+    abort_multipart_upload,
+    complete_multipart_upload,
+    create_multipart_upload,
+    list_uploaded_parts,
+    presign_upload_parts,
+)
+
+logger = get_logger(__name__)
+
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+
+
+class UploadSessionError(ValueError):
+    """Операция недопустима в текущем состоянии сессии (истекла, завершена, не все части)."""
+
+
+def plan_parts(size: int, part_size: int | None = None) -> tuple[int, int]:
+    """Размер и число частей: не меньше 5 MiB и не больше 10 000 частей (лимиты S3)."""
+    part_size = max(part_size or settings.storage.multipart_part_size_bytes, MIN_PART_SIZE)
+    part_size = max(part_size, math.ceil(size / MAX_MULTIPART_PARTS))
+    if part_size > MAX_PART_SIZE:
+        raise UploadSessionError("Object is too large for a multipart upload")
+    return part_size, max(1, math.ceil(size / part_size))
+
+
+@dataclass(slots=True)
+class SweepResult:
+    expired: int = 0
+    failed: int = 0
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class UploadSessionServiceDB:
+    """Multipart-загрузки: клиент грузит части напрямую в S3 по presigned URL,
+    сервер только подписывает URL и собирает объект. Пропускная способность
+    ограничена параллелизмом клиента, а не API."""
+
+    async def create(
+        self,
+        session: AsyncSession,
+        *,
+        brief_id: str,
+        filename: str,
+        content_type: str,
+        type: str,
+        size: int,
+        part_size: int | None,
+        meta: dict | None,
+        created_by: str,
+    ) -> UploadSession:
+        part_size, part_count = plan_parts(size, part_size)
+        bucket = settings.storage.bucket_assets
+        object_key = new_object_key(brief_id, filename)
+        upload_id = await create_multipart_upload(bucket=bucket, object_key=object_key, content_type=content_type)
+        obj = UploadSession(
+            brief_id=brief_id,
+            object_key=object_key,
+            upload_id=upload_id,
+            filename=filename,
+            content_type=content_type,
+            type=type,
+            size=size,
+            part_size=part_size,
+            part_count=part_count,
+            meta=meta,
+            created_by=created_by,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.storage.multipart_session_ttl_seconds),
+        )
+        session.add(obj)
+        try:
+            async with brief_reference(session):
+                await session.commit()
+        except ValueError:
+            await abort_multipart_upload(bucket=bucket, object_key=object_key, upload_id=upload_id)
+            raise
+        return obj
+
+    async def get(self, session: AsyncSession, upload_session_id: str) -> UploadSession | None:
+        return await session.get(UploadSession, upload_session_id)
+
+    async def part_urls(self, upload: UploadSession, part_numbers: list[int]) -> dict[int, str]:
+        self._ensure_active(upload)
+        invalid = [n for n in part_numbers if not 1 <= n <= upload.part_count]
+        if invalid:
+            raise UploadSessionError(f"Part numbers out of range 1..{upload.part_count}: {invalid[:10]}")
+        return await presign_upload_parts(
+            bucket=settings.storage.bucket_assets,
+            object_key=upload.object_key,
+            upload_id=upload.upload_id,
+            part_numbers=sorted(set(part_numbers)),
+            expires=timedelta(seconds=settings.storage.multipart_url_ttl_seconds),
+        )
+
+    async def record_part(
+        self, session: AsyncSession, upload: UploadSession, *, part_number: int, etag: str, size: int | None
+    ) -> None:
+        """Отметка клиента о загруженной части (для возобновления); повтор перезаписывает ETag."""
+        self._ensure_active(upload)
+        if not 1 <= part_number <= upload.part_count:
+            raise UploadSessionError(f"Part number out of range 1..{upload.part_count}")
+        dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(UploadPart).values(
+            session_id=upload.id, part_number=part_number, etag=etag.strip('"'), size=size
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UploadPart.session_id, UploadPart.part_number],
+            set_={"etag": stmt.excluded.etag, "size": stmt.excluded.size},
+        )
+        await session.execute(stmt)
+        await session.commit()
+
+    async def list_parts(self, session: AsyncSession, upload: UploadSession) -> list[UploadPart]:
+        res = await session.scalars(
+            select(UploadPart).where(UploadPart.session_id == upload.id).order_by(UploadPart.part_number)
+        )
+        return list(res.all())
+
+    async def complete(self, session: AsyncSession, upload: UploadSession) -> Asset:
+        """Собирает объект из частей, принятых хранилищем, и регистрирует `Asset`.
+
+        Список частей берется из S3, а не из отметок клиента: отметки могут
+        отставать. Сессия захватывается через `active -> completing`, чтобы
+        параллельные вызовы не собирали объект дважды. Если объект с тем же
+        ETag и размером уже хранится, ассет ссылается на него, а собранная
+        копия удаляется.
+        """
+        self._ensure_active(upload)
+        await self._transition(session, upload, "active", "completing")
+        bucket = settings.storage.bucket_assets
+        try:
+            parts = await list_uploaded_parts(bucket=bucket, object_key=upload.object_key, upload_id=upload.upload_id)
+            numbers = {part.part_number for part in parts}
+            missing = [n for n in range(1, upload.part_count + 1) if n not in numbers]
+            if missing:
+                raise UploadSessionError(f"Missing parts: {missing[:20]}")
+            uploaded = sum(part.size or 0 for part in parts if part.part_number <= upload.part_count)
+            if uploaded != upload.size:
+                raise UploadSessionError(f"Uploaded {uploaded} bytes, expected {upload.size}")
+            etag = await complete_multipart_upload(
+                bucket=bucket,
+                object_key=upload.object_key,
+                upload_id=upload.upload_id,
+                parts=[part for part in parts if part.part_number <= upload.part_count],
+            )
+        except S3Error as exc:
+            await self._transition(session, upload, "completing", "active")
+            raise UploadSessionError(f"Storage rejected the upload: {exc.code}") from exc
+        except Exception:
+            # Сессию можно повторить: возвращаем ее в active при любой ошибке
+            await self._transition(session, upload, "completing", "active")
+            raise
+
+        content_hash = etag_content_hash(etag)
+        object_key = upload.object_key
+        if content_hash:
+            duplicate = (await asset_service.find_duplicates(session, [content_hash])).get(content_hash)
+            if duplicate is not None and duplicate.size == upload.size:
+                object_key = duplicate.object_key
+        asset = Asset(
+            id=str(uuid4()),
+            brief_id=upload.brief_id,
+            object_key=object_key,
+            filename=upload.filename,
+            content_type=upload.content_type,
+            size=upload.size,
+            type=upload.type,
+            meta=upload.meta,
+            created_by=upload.created_by,
+            # Части и размер уже сверены с хранилищем — отдельная проверка не нужна
+            etag=(etag or "").strip('"') or None,
+            content_hash=content_hash,
+            status="verified",
+        )
+        session.add(asset)
+        async with brief_reference(session):
+            await session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload.id)
+                .values(status="completed", asset_id=asset.id)
+            )
+            await asset_service.acquire_objects(session, [object_key])
+            await session.commit()
+        set_committed_value(upload, "status", "completed")
+        set_committed_value(upload, "asset_id", asset.id)
+        if object_key != upload.object_key:
+            await asset_service.remove_unreferenced(upload.object_key)
+        await session.refresh(asset)
+        return asset
+
+    async def abort(self, session: AsyncSession, upload: UploadSession) -> None:
+        """Прерывает загрузку; S3 удаляет уже принятые части."""
+        await self._transition(session, upload, "active", "aborted")
+        await abort_multipart_upload(
+            bucket=settings.storage.bucket_assets, object_key=upload.object_key, upload_id=upload.upload_id
+        )
+
+    async def sweep_expired(self, session: AsyncSession) -> SweepResult:
+        """Одна пачка брошенных сессий: `active` после `expires_at` и `completing`
+        дольше `STORAGE_MULTIPART_COMPLETING_TIMEOUT_SECONDS` (процесс упал во время сборки).
+
+        Сессия сначала захватывается условным UPDATE в `expired` — после этого
+        ни complete, ни abort клиента ее не тронут, а реплики не делят одну
+        сессию, — затем в S3 прерывается загрузка и удаляются ее части.
+        Объект, который успели собрать до падения, удаляется: ассета на него нет.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.storage.multipart_completing_timeout_seconds)
+        abandoned = or_(
+            (UploadSession.status == "active") & (UploadSession.expires_at <= now),
+            (UploadSession.status == "completing") & (UploadSession.updated_at <= stale),
+        )
+        res = await session.execute(
+            select(UploadSession.id, UploadSession.status, UploadSession.object_key, UploadSession.upload_id)
+            .where(abandoned)
+            .order_by(UploadSession.expires_at)
+            .limit(settings.storage.multipart_sweep_batch_size)
+        )
+        rows = res.all()
+        await session.rollback()
+        result = SweepResult()
+        bucket = settings.storage.bucket_assets
+        for row in rows:
+            claimed = await session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == row.id, abandoned)
+                .values(status="expired")
+            )
+            await session.commit()
+            if claimed.rowcount != 1:
+                continue
+            result.expired += 1
+            try:
+                await abort_multipart_upload(bucket=bucket, object_key=row.object_key, upload_id=row.upload_id)
+            except S3Error as exc:
+                # NoSuchUpload — загрузка уже собрана или прервана
+                if exc.code != "NoSuchUpload":
+                    result.failed += 1
+                    logger.warning("upload_abort_failed", upload_session_id=row.id, error=str(exc))
+            except HTTPError as exc:
+                result.failed += 1
+                logger.warning("upload_abort_failed", upload_session_id=row.id, error=str(exc))
+            if row.status == "completing":
+                await asset_service.remove_unreferenced(row.object_key)
+        if rows:
+            logger.info("upload_sessions_expired", expired=result.expired, failed=result.failed)
+        return result
+
+    async def run_sweeper(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        interval = settings.storage.multipart_sweep_interval_seconds
+        while True:
+            try:
+                async with session_factory() as session:
+                    result = await self.sweep_expired(session)
+            except SQLAlchemyError as exc:
+                logger.warning("upload_sweep_failed", error=str(exc))
+                result = SweepResult()
+            # Полная пачка — вероятно, есть еще: продолжаем без ожидания
+            if result.expired >= settings.storage.multipart_sweep_batch_size:
+                continue
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _ensure_active(upload: UploadSession) -> None:
+        if upload.status != "active":
+            raise UploadSessionError(f"Upload session is {upload.status}")
+        if _as_utc(upload.expires_at) <= datetime.now(timezone.utc):
+            raise UploadSessionError("Upload session has expired")
+
+    @staticmethod
+    async def _transition(session: AsyncSession, upload: UploadSession, current: str, new: str) -> None:
+        res = await session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload.id, UploadSession.status == current)
+            .values(status=new)
+        )
+        if res.rowcount != 1:
+            await session.rollback()
+            raise UploadSessionError(f"Upload session is no longer {current}")
+        await session.commit()
+        # Без пометки объекта измененным: статус уже записан условным UPDATE
+        set_committed_value(upload, "status", new)
+
+
+upload_session_service = UploadSessionServiceDB()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from minio.datatypes import Object
+from minio.error import S3Error, ServerError
+from sqlalchemy import Row, bindparam, case, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from urllib3.exceptions import HTTPError
+
+from apps.assets.models import Asset
+from config.logging import get_logger
+from config.settings import settings
+from infrastructure.storage.minio_client import MISSING_OBJECT_CODES, stat_object
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class VerifyResult:
+    verified: int = 0
+    missing: int = 0
+    failed: int = 0
+    # Из failed: отказы самого объекта (не недоступность хранилища), они копятся в verify_attempts
+    rejected: int = 0
+
+
+class AssetVerifier:
+    """Сверяет зарегистрированные ассеты с объектами в хранилище.
+
+    attach только записывает строку со статусом `uploaded` и будит проверку;
+    фоновая задача пачками делает stat в пуле хранилища (вне транзакции БД),
+    записывает реальные размер, ETag и Content-Type и переводит ассет
+    в `verified` или `missing`.
+    Ассет, на котором stat раз за разом падает по другой причине (нет доступа,
+    недопустимый ключ), после `STORAGE_VERIFY_MAX_ATTEMPTS` попыток получает
+    `failed`; до того он выбирается после ассетов без неудачных попыток.
+    """
+
+    def __init__(self) -> None:
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        """Есть новые ассеты — проверить, не дожидаясь периода опроса."""
+        self._wakeup.set()
+
+    async def run(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        interval = settings.storage.verify_interval_seconds
+        while True:
+            self._wakeup.clear()
+            try:
+                async with session_factory() as session:
+                    result = await self.verify_pending(session)
+            except SQLAlchemyError as exc:
+                logger.warning("asset_verification_failed", error=str(exc))
+                result = VerifyResult()
+            # Полная пачка обработана — вероятно, есть еще: продолжаем без ожидания.
+            # Ошибки хранилища не считаются, иначе при недоступном S3 цикл крутился бы вхолостую.
+            if result.verified + result.missing + result.rejected >= settings.storage.verify_batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, session: AsyncSession) -> list[Row]:
+        """Забирает пачку ассетов арендой `verify_claimed_until` и сразу фиксирует это.
+
+        Строки блокируются (`FOR UPDATE SKIP LOCKED` в Postgres) только на
+        время этой короткой транзакции: реплики делят работу, а удаление
+        ассета или запись meta не ждут ответа хранилища.
+        """
+        now = datetime.now(timezone.utc)
+        res = await session.execute(
+            select(Asset.id, Asset.object_key)
+            .where(
+                Asset.status == "uploaded",
+                or_(Asset.verify_claimed_until.is_(None), Asset.verify_claimed_until <= now),
+            )
+            # Застрявшие строки не должны вытеснять новые из пачки
+            .order_by(Asset.verify_attempts, Asset.created_at)
+            .limit(settings.storage.verify_batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = res.all()
+        if rows:
+            await session.execute(
+                update(Asset)
+                .where(Asset.id.in_([row.id for row in rows]))
+                .values(verify_claimed_until=now + timedelta(seconds=settings.storage.verify_lease_seconds))
+            )
+        await session.commit()
+        return rows
+
+    async def verify_pending(self, session: AsyncSession) -> VerifyResult:
+        """Одна пачка непроверенных ассетов: захват, stat вне транзакции, запись итогов.
+
+        Ассет, итог проверки которого не записан (процесс упал), снова
+        становится доступен, когда истекает аренда.
+        """
+        rows = await self._claim(session)
+        if not rows:
+            return VerifyResult()
+
+        semaphore = asyncio.Semaphore(settings.storage.verify_concurrency)
+
+        async def stat(object_key: str) -> Object:
+            async with semaphore:
+                return await stat_object(bucket=settings.storage.bucket_assets, object_key=object_key)
+
+        stats = await asyncio.gather(*(stat(row.object_key) for row in rows), return_exceptions=True)
+
+        verified: list[dict] = []
+        missing: list[dict] = []
+        rejected: list[dict] = []
+        unavailable: list[str] = []
+        result = VerifyResult()
+        for row, stat_result in zip(rows, stats):
+            if isinstance(stat_result, S3Error) and stat_result.code in MISSING_OBJECT_CODES:
+                missing.append({"b_id": row.id})
+            elif isinstance(stat_result, (HTTPError, OSError, ServerError)):
+                # Хранилище недоступно: ассет останется `uploaded`, попытка не засчитывается
+                result.failed += 1
+                unavailable.append(row.id)
+                logger.warning("asset_stat_failed", asset_id=row.id, error=str(stat_result))
+            elif isinstance(stat_result, Exception):
+                # Отказ по самому объекту (AccessDenied, недопустимый ключ) — копится до лимита
+                result.failed += 1
+                rejected.append({"b_id": row.id})
+                logger.warning("asset_stat_rejected", asset_id=row.id, error=repr(stat_result))
+            elif isinstance(stat_result, BaseException):
+                raise stat_result
+            else:
+                verified.append(
+                    {
+                        "b_id": row.id,
+                        "b_size": stat_result.size,
+                        "b_etag": (stat_result.etag or "").strip('"') or None,
+                        "b_content_type": stat_result.content_type,
+                    }
+                )
+
+        table = Asset.__table__
+        pending = (table.c.id == bindparam("b_id")) & (table.c.status == "uploaded")
+        if verified:
+            await session.execute(
+                update(table)
+                .where(pending)
+                .values(
+                    verify_claimed_until=None,
+                    status="verified",
+                    size=bindparam("b_size"),
+                    etag=bindparam("b_etag"),
+                    content_type=func.coalesce(bindparam("b_content_type"), table.c.content_type),
+                ),
+                verified,
+            )
+        if missing:
+            await session.execute(
+                update(table).where(pending).values(status="missing", verify_claimed_until=None), missing
+            )
+        if rejected:
+            attempts = table.c.verify_attempts + 1
+            await session.execute(
+                update(table)
+                .where(pending)
+                .values(
+                    verify_claimed_until=None,
+                    verify_attempts=attempts,
+                    status=case(
+                        (attempts >= settings.storage.verify_max_attempts, "failed"), else_=table.c.status
+                    ),
+                ),
+                rejected,
+            )
+        if unavailable:
+            # Хранилище не ответило: аренда снимается, ассет проверяется в следующем проходе
+            await session.execute(
+                update(Asset).where(Asset.id.in_(unavailable)).values(verify_claimed_until=None)
+            )
+        await session.commit()
+        result.verified, result.missing, result.rejected = len(verified), len(missing), len(rejected)
+        logger.info(
+            "assets_verified",
+            verified=result.verified,
+            missing=result.missing,
+            failed=result.failed,
+            rejected=result.rejected,
+        )
+        return result
+
+
+asset_verifier = AssetVerifier()
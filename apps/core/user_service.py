@@ -1,46 +1,184 @@
 from __future__ import annotations
 
-from typing import Dict
+import asyncio
+import itertools
 
-from domain.models.user import Role, User
-from infrastructure.auth.security import get_password_hash
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from apps.core.models import UserAccount, UserDirectoryVersion
+from config.logging import get_logger
 from config.settings import settings
+from domain.models.user import Role, User
+from infrastructure.auth.security import get_password_hash_async
+from infrastructure.cache.memory import TTLCache
+
+logger = get_logger(__name__)
+
+_DIRECTORY_ROW_ID = 1
+# Псевдоним для упрощенного логина без домена
+ADMIN_ALIAS = "admin"
+
 
+class UserServiceDB:
+    """Пользователи в БД с локальным read-through кешем.
 
-class InMemoryUserService:
-    """Простейший сервис пользователей для skeleton."""
+    Каждая запись увеличивает `UserDirectoryVersion`; фоновая задача
+    (`run_sync`) опрашивает счетчик и сбрасывает кеш, когда пользователей
+    изменил другой воркер.
+    """
 
     def __init__(self) -> None:
-        self._users: Dict[str, User] = {}
-        self._bootstrap()
-
-    def _bootstrap(self) -> None:
-        admin = User(
-            id="admin",
-            email=settings.demo_user.admin_email,
-            full_name="Default Admin",
-            hashed_password=get_password_hash(settings.demo_user.admin_password),
-            role="admin",
+        self._cache: TTLCache[str, User] = TTLCache(
+            "users",
+            maxsize=settings.cache.users_max_entries,
+            ttl=settings.cache.users_ttl_seconds,
         )
-        self._users[admin.email] = admin
-        # Псевдоним для упрощенного логина без домена
-        self._users.setdefault("admin", admin)
-
-    def get_user_by_email(self, email: str) -> User | None:
-        return self._users.get(email)
-
-    def create_user(self, email: str, full_name: str, password: str, role: Role) -> User:
-        if email in self._users:
-            raise ValueError("User already exists")
-        user = User(
-            id=email,
-            email=email,
-            full_name=full_name,
-            hashed_password=get_password_hash(password),
-            role=role,
+        self._counter = itertools.count(1)
+        self._base_revision = next(self._counter)
+        self._revisions: dict[str, int] = {}
+        self._seen_version: int | None = None
+
+    @staticmethod
+    def _resolve_alias(email: str) -> str:
+        return settings.demo_user.admin_email if email == ADMIN_ALIAS else email
+
+    @staticmethod
+    def _to_domain(row: UserAccount) -> User:
+        return User(
+            id=row.id,
+            email=row.email,
+            full_name=row.full_name,
+            hashed_password=row.hashed_password,
+            role=row.role,
+            is_active=row.is_active,
+            created_at=row.created_at,
         )
-        self._users[email] = user
+
+    async def get_user_by_email(self, session: AsyncSession, email: str) -> User | None:
+        email = self._resolve_alias(email)
+        user = self._cache.get(email)
+        if user is not None:
+            return user
+        row = await session.scalar(select(UserAccount).where(UserAccount.email == email))
+        if row is None:
+            return None
+        user = self._to_domain(row)
+        self._cache.set(email, user)
         return user
 
+    def revision(self, email: str) -> int:
+        """Локальная ревизия пользователя; кеши сверяют ее при каждом попадании."""
+        return self._revisions.get(email, self._base_revision)
+
+    async def create_user(
+        self,
+        session: AsyncSession,
+        email: str,
+        full_name: str,
+        password: str | None = None,
+        role: Role = "marketing",
+        *,
+        hashed_password: str | None = None,
+    ) -> User:
+        if hashed_password is not None and not hashed_password.strip():
+            # Пустой хеш не проходит проверку passlib: вход вечно отвечал бы 500
+            raise ValueError("Password hash must not be empty")
+        if hashed_password is None:
+            if password is None:
+                raise ValueError("Either password or hashed_password is required")
+            hashed_password = await get_password_hash_async(password)
+        row = UserAccount(email=email, full_name=full_name, hashed_password=hashed_password, role=role)
+        session.add(row)
+        try:
+            await self._bump_version(session)
+            await session.commit()
+        except IntegrityError as exc:
+            await session.rollback()
+            raise ValueError("User already exists") from exc
+        self._invalidate(email)
+        return self._to_domain(row)
+
+    async def update_user(self, session: AsyncSession, email: str, **fields: object) -> User:
+        if "password" in fields:
+            fields["hashed_password"] = await get_password_hash_async(str(fields.pop("password")))
+        email = self._resolve_alias(email)
+        row = await session.scalar(
+            update(UserAccount).where(UserAccount.email == email).values(**fields).returning(UserAccount)
+        )
+        if row is None:
+            await session.rollback()
+            raise KeyError(email)
+        await self._bump_version(session)
+        await session.commit()
+        self._invalidate(email)
+        return self._to_domain(row)
+
+    async def deactivate_user(self, session: AsyncSession, email: str) -> User:
+        return await self.update_user(session, email, is_active=False)
+
+    async def ensure_admin(self, session: AsyncSession) -> User | None:
+        """Создает демо-администратора, если его еще нет.
+
+        При старте вызывается только с готовым хешем (`DEMO_ADMIN_PASSWORD_HASH`);
+        без него хеш считается в пуле проверки паролей при первом входе.
+        """
+        email = settings.demo_user.admin_email
+        existing = await self.get_user_by_email(session, email)
+        if existing is not None:
+            return existing
+        try:
+            return await self.create_user(
+                session,
+                email=email,
+                full_name="Default Admin",
+                password=settings.demo_user.admin_password,
+                role="admin",
+                hashed_password=settings.demo_user.admin_password_hash,
+            )
+        except ValueError:
+            # Параллельный воркер успел создать администратора
+            return await self.get_user_by_email(session, email)
+
+    def is_admin_login(self, email: str) -> bool:
+        return self._resolve_alias(email) == settings.demo_user.admin_email
+
+    async def run_sync(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Опрашивает счетчик изменений и сбрасывает кеш при расхождении."""
+        interval = settings.cache.users_sync_interval_seconds
+        while True:
+            try:
+                async with session_factory() as session:
+                    version = await session.scalar(
+                        select(UserDirectoryVersion.version).where(UserDirectoryVersion.id == _DIRECTORY_ROW_ID)
+                    )
+                self._observe_version(version or 0)
+            except SQLAlchemyError as exc:
+                logger.warning("user_directory_sync_failed", error=str(exc))
+            await asyncio.sleep(interval)
+
+    def _observe_version(self, version: int) -> None:
+        if self._seen_version is not None and version != self._seen_version:
+            logger.info("user_directory_changed", version=version)
+            self._cache.clear()
+            self._revisions.clear()
+            self._base_revision = next(self._counter)
+        self._seen_version = version
+
+    def _invalidate(self, email: str) -> None:
+        self._cache.pop(email)
+        self._revisions[email] = next(self._counter)
+
+    @staticmethod
+    async def _bump_version(session: AsyncSession) -> None:
+        res = await session.execute(
+            update(UserDirectoryVersion)
+            .where(UserDirectoryVersion.id == _DIRECTORY_ROW_ID)
+            .values(version=UserDirectoryVersion.version + 1)
+        )
+        if res.rowcount == 0:
+            await session.execute(insert(UserDirectoryVersion).values(id=_DIRECTORY_ROW_ID, version=1))
+
 
-user_service = InMemoryUserService()
+user_service = UserServiceDB()
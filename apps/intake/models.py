@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Float, String, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from infrastructure.db.base import Base
@@ -12,6 +12,11 @@ from infrastructure.db.base import Base
 class Brief(Base):
     """Brief entity stored in PostgreSQL."""
 
+    __table_args__ = (
+        Index("ix_brief_created_at", "created_at"),
+        Index("ix_brief_status_created_at", "status", "created_at"),
+    )
+
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
     campaign_name: Mapped[str] = mapped_column(String, nullable=False)
     objective: Mapped[str] = mapped_column(String, nullable=False)
@@ -21,3 +26,6 @@ class Brief(Base):
     status: Mapped[str] = mapped_column(String, nullable=False, default="received")
     created_by: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+    # Увеличивается при каждом изменении; входит в ETag
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
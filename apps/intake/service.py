@@ -1,11 +1,47 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import AsyncIterator, Iterable, Sequence
+from contextlib import asynccontextmanager
+
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.schemas.intake import BriefCreateRequest
 from apps.intake.models import Brief
 from domain.models.user import User
+from infrastructure.db.pagination import Page, paginate, select_columns
+
+
+# Внешние ключи на бриф: только их нарушение означает «бриф не найден»
+BRIEF_FOREIGN_KEYS = frozenset(
+    {"fk_asset_brief_id_brief", "fk_script_brief_id_brief", "fk_uploadsession_brief_id_brief"}
+)
+
+
+def _violates_brief_reference(exc: IntegrityError) -> bool:
+    # asyncpg сообщает имя ограничения в исходном исключении драйвера
+    driver_error = exc.orig.__cause__ if exc.orig is not None else None
+    constraint = getattr(driver_error, "constraint_name", None)
+    if constraint is not None:
+        return constraint in BRIEF_FOREIGN_KEYS
+    # SQLite имени не сообщает; других внешних ключей у таблиц со ссылкой на бриф нет
+    return "FOREIGN KEY constraint failed" in str(exc.orig)
+
+
+@asynccontextmanager
+async def brief_reference(session: AsyncSession) -> AsyncIterator[None]:
+    """Запись со ссылкой на бриф: нарушение внешнего ключа на бриф — ValueError для роутера.
+
+    Прочие нарушения целостности пробрасываются как есть.
+    """
+    try:
+        yield
+    except IntegrityError as exc:
+        await session.rollback()
+        if not _violates_brief_reference(exc):
+            raise
+        raise ValueError("Brief not found") from exc
 
 
 class IntakeServiceDB:
@@ -25,19 +61,68 @@ class IntakeServiceDB:
         await session.refresh(brief)
         return brief
 
-    async def list_briefs(self, session: AsyncSession) -> list[Brief]:
-        result = await session.execute(select(Brief).order_by(Brief.created_at.desc()))
-        return list(result.scalars().all())
+    async def create_briefs(
+        self, session: AsyncSession, payloads: list[BriefCreateRequest], user: User
+    ) -> list[Brief]:
+        """Пакетное создание одним multi-row INSERT ... RETURNING в одной транзакции."""
+        if not payloads:
+            return []
+        rows = [
+            {
+                "campaign_name": p.campaign_name,
+                "objective": p.objective,
+                "target_audience": p.target_audience,
+                "launch_date": p.launch_date,
+                "budget": p.budget,
+                "created_by": user.email,
+            }
+            for p in payloads
+        ]
+        res = await session.scalars(insert(Brief).returning(Brief, sort_by_parameter_order=True), rows)
+        briefs = list(res.all())
+        await session.commit()
+        return briefs
+
+    async def list_briefs(
+        self,
+        session: AsyncSession,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Page[Brief] | Page[Row]:
+        """С `fields` выбираются только эти колонки, элементы страницы — `Row`."""
+        stmt = select(Brief) if fields is None else select_columns(Brief, fields)
+        return await paginate(session, stmt, Brief, limit=limit, cursor=cursor, rows=fields is not None)
+
+    async def existing_ids(self, session: AsyncSession, brief_ids: Iterable[str]) -> set[str]:
+        """Какие из `brief_ids` существуют — одна выборка по первичному ключу."""
+        ids = set(brief_ids)
+        if not ids:
+            return set()
+        res = await session.scalars(select(Brief.id).where(Brief.id.in_(ids)))
+        return set(res.all())
 
     async def get_brief(self, session: AsyncSession, brief_id: str) -> Brief | None:
         return await session.get(Brief, brief_id)
 
-    async def update_brief(self, session: AsyncSession, brief: Brief, **fields) -> Brief:
-        for k, v in fields.items():
-            if v is not None:
-                setattr(brief, k, v)
+    async def probe_brief(self, session: AsyncSession, brief_id: str) -> Row | None:
+        """`(updated_at, version)` по первичному ключу — для условных запросов."""
+        res = await session.execute(select(Brief.updated_at, Brief.version).where(Brief.id == brief_id))
+        return res.first()
+
+    async def update_brief(self, session: AsyncSession, brief_id: str, **fields) -> Brief | None:
+        """Один `UPDATE ... RETURNING`; `None`, если брифа нет."""
+        values = {k: v for k, v in fields.items() if v is not None}
+        if not values:
+            return await self.get_brief(session, brief_id)
+        brief = await session.scalar(
+            update(Brief)
+            .where(Brief.id == brief_id)
+            .values(**values, version=Brief.version + 1)
+            .returning(Brief)
+        )
         await session.commit()
-        await session.refresh(brief)
         return brief
 
     async def delete_brief(self, session: AsyncSession, brief: Brief) -> None:
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DDL, ColumnElement, DateTime, ForeignKey, Index, String, Text, event, func, text
+from sqlalchemy.dialects import postgresql  # noqa: F401 - регистрирует типизированные to_tsvector/ts_*
 from sqlalchemy.orm import Mapped, mapped_column
 
 from infrastructure.db.base import Base
@@ -12,8 +14,13 @@ from infrastructure.db.base import Base
 class Script(Base):
     """Script/Storyboard entity linked to a brief."""
 
+    __table_args__ = (
+        Index("ix_script_brief_id_created_at", "brief_id", "created_at"),
+        Index("ix_script_status_created_at", "status", "created_at"),
+    )
+
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
-    brief_id: Mapped[str] = mapped_column(String, nullable=False)
+    brief_id: Mapped[str] = mapped_column(String, ForeignKey("brief.id", ondelete="CASCADE", name="fk_script_brief_id_brief"), nullable=False)
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     outline: Mapped[str] = mapped_column(Text, nullable=True)
@@ -24,3 +31,44 @@ class Script(Base):
     created_by: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+
+
+# Полнотекстовый поиск. Выражение документа используется и в индексе, и в
+# запросах: литералы (а не bind-параметры) нужны, чтобы планировщик Postgres
+# сопоставил условие с GIN-индексом по выражению.
+TS_CONFIG = text("'simple'")
+
+
+def search_document() -> ColumnElement[Any]:
+    columns = Script.__table__.c
+    blank, space = text("''"), text("' '")
+    document = (
+        func.coalesce(columns.title, blank)
+        + space
+        + func.coalesce(columns.outline, blank)
+        + space
+        + func.coalesce(columns.draft_text, blank)
+    )
+    return func.to_tsvector(TS_CONFIG, document)
+
+
+Index("ix_script_search", search_document(), postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# Локальная/тестовая SQLite: внешний FTS5-индекс, синхронизируемый триггерами
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS script_fts USING fts5("
+    "title, outline, draft_text, content='script', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS script_fts_ai AFTER INSERT ON script BEGIN "
+    "INSERT INTO script_fts(rowid, title, outline, draft_text) "
+    "VALUES (new.rowid, new.title, new.outline, new.draft_text); END",
+    "CREATE TRIGGER IF NOT EXISTS script_fts_ad AFTER DELETE ON script BEGIN "
+    "INSERT INTO script_fts(script_fts, rowid, title, outline, draft_text) "
+    "VALUES ('delete', old.rowid, old.title, old.outline, old.draft_text); END",
+    "CREATE TRIGGER IF NOT EXISTS script_fts_au AFTER UPDATE ON script BEGIN "
+    "INSERT INTO script_fts(script_fts, rowid, title, outline, draft_text) "
+    "VALUES ('delete', old.rowid, old.title, old.outline, old.draft_text); "
+    "INSERT INTO script_fts(rowid, title, outline, draft_text) "
+    "VALUES (new.rowid, new.title, new.outline, new.draft_text); END",
+)
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Script.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
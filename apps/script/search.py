@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import html
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import func, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.script.models import TS_CONFIG, Script, search_document
+
+# СУБД отмечает совпадения символами из Private Use Area, а не тегами: текст
+# сценария экранируется уже в Python, и в `snippet` разметкой остается только <b>.
+_MARK_START, _MARK_STOP = "\ue000", "\ue001"
+_HEADLINE_OPTIONS = f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, MaxFragments=2, MaxWords=24, MinWords=8"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _render_snippet(raw: str | None) -> str | None:
+    """HTML-безопасный фрагмент: текст экранирован, совпадения в <b>."""
+    if raw is None:
+        return None
+    return html.escape(raw).replace(_MARK_START, "<b>").replace(_MARK_STOP, "</b>")
+
+
+@dataclass(slots=True)
+class ScriptSearchHit:
+    id: str
+    brief_id: str
+    title: str
+    status: str
+    rank: float
+    snippet: str | None
+
+
+async def search_scripts(
+    session: AsyncSession, query: str, *, brief_id: str | None = None, limit: int = 20
+) -> list[ScriptSearchHit]:
+    """Ранжированный полнотекстовый поиск по title/outline/draft_text.
+
+    Postgres — GIN-индекс по tsvector, SQLite — FTS5; остальные диалекты
+    получают неиндексированный LIKE без ранжирования.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return await _search_postgres(session, query, brief_id=brief_id, limit=limit)
+    if dialect == "sqlite":
+        return await _search_sqlite(session, query, brief_id=brief_id, limit=limit)
+    return await _search_like(session, query, brief_id=brief_id, limit=limit)
+
+
+async def _search_postgres(
+    session: AsyncSession, query: str, *, brief_id: str | None, limit: int
+) -> list[ScriptSearchHit]:
+    document = search_document()
+    ts_query = func.websearch_to_tsquery(TS_CONFIG, query)
+    rank = func.ts_rank_cd(document, ts_query)
+    # Сначала отбираем и ранжируем id по индексу, затем считаем дорогой
+    # ts_headline только для попавших в лимит строк.
+    top = select(Script.id, rank.label("rank")).where(document.bool_op("@@")(ts_query))
+    if brief_id:
+        top = top.where(Script.brief_id == brief_id)
+    top = top.order_by(rank.desc()).limit(limit).subquery()
+    # Все поля документа, чтобы совпадение только в заголовке тоже подсвечивалось
+    snippet = func.ts_headline(
+        TS_CONFIG,
+        func.concat_ws("\n", Script.title, Script.outline, Script.draft_text),
+        ts_query,
+        text(f"'{_HEADLINE_OPTIONS}'"),
+    )
+    stmt = (
+        select(Script.id, Script.brief_id, Script.title, Script.status, top.c.rank, snippet.label("snippet"))
+        .join(top, top.c.id == Script.id)
+        .order_by(top.c.rank.desc())
+    )
+    res = await session.execute(stmt)
+    return [ScriptSearchHit(**{**row._asdict(), "snippet": _render_snippet(row.snippet)}) for row in res]
+
+
+def _fts5_query(query: str) -> str:
+    # Каждый токен — отдельная фраза в кавычках: пользовательский ввод не
+    # интерпретируется как синтаксис FTS5, токены объединяются через AND.
+    return " ".join(f'"{token}"' for token in _TOKEN_RE.findall(query))
+
+
+async def _search_sqlite(
+    session: AsyncSession, query: str, *, brief_id: str | None, limit: int
+) -> list[ScriptSearchHit]:
+    match = _fts5_query(query)
+    if not match:
+        return []
+    sql = (
+        "SELECT s.id, s.brief_id, s.title, s.status, -bm25(script_fts) AS rank, "
+        "snippet(script_fts, -1, :mark_start, :mark_stop, '…', 24) AS snippet "
+        "FROM script_fts JOIN script AS s ON s.rowid = script_fts.rowid "
+        "WHERE script_fts MATCH :match"
+    )
+    params: dict[str, object] = {
+        "match": match,
+        "limit": limit,
+        "mark_start": _MARK_START,
+        "mark_stop": _MARK_STOP,
+    }
+    if brief_id:
+        sql += " AND s.brief_id = :brief_id"
+        params["brief_id"] = brief_id
+    sql += " ORDER BY bm25(script_fts) LIMIT :limit"
+    res = await session.execute(text(sql), params)
+    return [ScriptSearchHit(**{**row._asdict(), "snippet": _render_snippet(row.snippet)}) for row in res]
+
+
+async def _search_like(
+    session: AsyncSession, query: str, *, brief_id: str | None, limit: int
+) -> list[ScriptSearchHit]:
+    pattern = f"%{query}%"
+    stmt = select(
+        Script.id, Script.brief_id, Script.title, Script.status, literal_column("0.0").label("rank")
+    ).where(or_(Script.title.ilike(pattern), Script.outline.ilike(pattern), Script.draft_text.ilike(pattern)))
+    if brief_id:
+        stmt = stmt.where(Script.brief_id == brief_id)
+    res = await session.execute(stmt.order_by(Script.created_at.desc()).limit(limit))
+    return [ScriptSearchHit(**row._asdict(), snippet=None) for row in res]
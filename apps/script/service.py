@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Sequence
+
+from sqlalchemy import Row, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.intake.service import brief_reference
 from apps.script.models import Script
+from apps.script.search import ScriptSearchHit, search_scripts
+from infrastructure.db.pagination import Page, paginate, select_columns
 
 
 class ScriptServiceDB:
@@ -16,35 +21,70 @@ class ScriptServiceDB:
             created_by=created_by,
         )
         session.add(obj)
-        await session.commit()
+        async with brief_reference(session):
+            await session.commit()
         await session.refresh(obj)
         return obj
 
-    async def list(self, session: AsyncSession, *, brief_id: str | None = None) -> list[Script]:
-        stmt = select(Script).order_by(Script.created_at.desc())
+    async def create_many(self, session: AsyncSession, items: list[dict], *, created_by: str) -> list[Script]:
+        """Пакетное создание одним multi-row INSERT ... RETURNING в одной транзакции.
+
+        `items` — словари с полями `brief_id`, `title`, `outline`, `draft_text`.
+        """
+        if not items:
+            return []
+        rows = [{**item, "created_by": created_by} for item in items]
+        async with brief_reference(session):
+            res = await session.scalars(insert(Script).returning(Script, sort_by_parameter_order=True), rows)
+        objs = list(res.all())
+        await session.commit()
+        return objs
+
+    async def list(
+        self,
+        session: AsyncSession,
+        *,
+        brief_id: str | None = None,
+        limit: int,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Page[Script] | Page[Row]:
+        """С `fields` выбираются только эти колонки, элементы страницы — `Row`."""
+        stmt = select(Script) if fields is None else select_columns(Script, fields)
         if brief_id:
             stmt = stmt.where(Script.brief_id == brief_id)
-        res = await session.execute(stmt)
-        return list(res.scalars().all())
+        return await paginate(session, stmt, Script, limit=limit, cursor=cursor, rows=fields is not None)
+
+    async def search(
+        self, session: AsyncSession, query: str, *, brief_id: str | None = None, limit: int = 20
+    ) -> list[ScriptSearchHit]:
+        return await search_scripts(session, query, brief_id=brief_id, limit=limit)
 
     async def get(self, session: AsyncSession, script_id: str) -> Script | None:
         return await session.get(Script, script_id)
 
-    async def update(self, session: AsyncSession, obj: Script, *, title: str | None = None, outline: str | None = None, draft_text: str | None = None) -> Script:
-        if title is not None:
-            obj.title = title
-        if outline is not None:
-            obj.outline = outline
-        if draft_text is not None:
-            obj.draft_text = draft_text
-        await session.commit()
-        await session.refresh(obj)
-        return obj
+    async def probe(self, session: AsyncSession, script_id: str) -> Row | None:
+        """Только `updated_at` по первичному ключу — для условных запросов."""
+        res = await session.execute(select(Script.updated_at).where(Script.id == script_id))
+        return res.first()
 
-    async def set_status(self, session: AsyncSession, obj: Script, *, status: str) -> Script:
-        obj.status = status
+    async def update(self, session: AsyncSession, script_id: str, *, title: str | None = None, outline: str | None = None, draft_text: str | None = None) -> Script | None:
+        values = {
+            k: v
+            for k, v in {"title": title, "outline": outline, "draft_text": draft_text}.items()
+            if v is not None
+        }
+        if not values:
+            return await self.get(session, script_id)
+        return await self._update_returning(session, script_id, values)
+
+    async def set_status(self, session: AsyncSession, script_id: str, *, status: str) -> Script | None:
+        return await self._update_returning(session, script_id, {"status": status})
+
+    async def _update_returning(self, session: AsyncSession, script_id: str, values: dict) -> Script | None:
+        """Один `UPDATE ... RETURNING`; `None`, если скрипта нет."""
+        obj = await session.scalar(update(Script).where(Script.id == script_id).values(**values).returning(Script))
         await session.commit()
-        await session.refresh(obj)
         return obj
 
     async def delete(self, session: AsyncSession, obj: Script) -> None:
@@ -1,4 +1,7 @@
-from pydantic import Field
+import os
+from typing import Literal
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +10,66 @@ class TemporalSettings(BaseSettings):
     port: int = Field(default=7233, description="Temporal server RPC порт")
     namespace: str = Field(default="default", description="Temporal namespace")
 
+    task_queue: str = Field(default="campaign-production", description="Очередь workflow и легких activity")
+    cpu_task_queue: str = Field(
+        default="campaign-production-cpu", description="Очередь CPU-тяжелых activity (транскодинг, рендер, probe)"
+    )
+    worker_queues: list[Literal["default", "cpu"]] = Field(
+        default=["default", "cpu"],
+        description='Очереди, которые обслуживает процесс worker, JSON: ["default"], ["cpu"]',
+    )
+    max_concurrent_workflow_tasks: int = Field(default=100, ge=1)
+    max_concurrent_activities: int = Field(
+        default=100, ge=1, description="Параллельные (async) activity основной очереди"
+    )
+    max_cached_workflows: int = Field(default=1000, ge=0, description="Кеш workflow в памяти worker (sticky)")
+    cpu_executor: Literal["process", "thread"] = Field(
+        default="process", description="Пул для синхронных activity CPU-очереди"
+    )
+    cpu_executor_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 2,
+        ge=1,
+        description="Размер пула CPU-очереди; столько же activity берется в работу одновременно",
+    )
+    graceful_shutdown_seconds: float = Field(
+        default=30.0, ge=0, description="Сколько при остановке ждать завершения начатых activity"
+    )
+
+    payload_compression: Literal["auto", "zstd", "zlib", "none"] = Field(
+        default="auto", description="Сжатие payload в истории; auto — zstd, если установлен zstandard, иначе zlib"
+    )
+    payload_compression_threshold_bytes: int = Field(
+        default=4 * 1024, ge=0, description="Payload меньше этого размера не сжимаются"
+    )
+    payload_offload_threshold_bytes: int = Field(
+        default=256 * 1024,
+        ge=1024,
+        description="Payload крупнее (после сжатия) уходят в хранилище, в истории остается ссылка",
+    )
+    payload_offload_enabled: bool = Field(
+        default=True, description="Если выключено, крупные payload отклоняются вместо выгрузки"
+    )
+    payload_offload_prefix: str = Field(
+        default="temporal-payloads/", description="Префикс ключей выгруженных payload в бакете ассетов"
+    )
+    payload_retention_days: int = Field(
+        default=30,
+        ge=0,
+        description="Срок жизни выгруженных payload (правило lifecycle бакета); "
+        "должен превышать retention namespace плюс длительность workflow; 0 — без срока",
+    )
+    activity_cache_enabled: bool = Field(
+        default=True, description="Кешировать результаты дорогих activity по отпечатку входа"
+    )
+    activity_cache_prefix: str = Field(
+        default="activity-cache/", description="Префикс ключей кеша результатов activity в бакете ассетов"
+    )
+    activity_cache_retention_days: int = Field(
+        default=30,
+        ge=0,
+        description="Срок жизни записей кеша activity (правило lifecycle бакета); 0 — без срока",
+    )
+
     model_config = SettingsConfigDict(env_prefix="TEMPORAL_", env_file_encoding="utf-8")
 
 
@@ -24,10 +87,112 @@ class StorageSettings(BaseSettings):
     access_key: str = Field(default="minioadmin")
     secret_key: str = Field(default="minioadmin")
     bucket_assets: str = Field(default="assets")
+    region: str | None = Field(
+        default="us-east-1",
+        description="Регион бакетов; если задан, подпись URL не ходит в сеть за location",
+    )
+    max_pool_connections: int = Field(default=32, ge=1, description="Размер пула HTTP-соединений к S3")
+    executor_max_workers: int = Field(
+        default=16, ge=1, description="Потоки для блокирующих вызовов S3 из async-кода"
+    )
+    timeout_seconds: float = Field(default=30.0, gt=0, description="Таймаут connect/read к S3")
+    multipart_part_size_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=5 * 1024 * 1024,
+        le=5 * 1024 * 1024 * 1024,
+        description="Размер части multipart-загрузки по умолчанию (S3: от 5 MiB до 5 GiB)",
+    )
+    multipart_urls_per_request: int = Field(
+        default=100, ge=1, le=10_000, description="Сколько URL частей выдавать за один запрос"
+    )
+    multipart_url_ttl_seconds: int = Field(default=3600, ge=60, description="Срок жизни URL части")
+    multipart_session_ttl_seconds: int = Field(
+        default=7 * 24 * 3600, ge=3600, description="Сколько живет незавершенная сессия загрузки"
+    )
+    multipart_completing_timeout_seconds: int = Field(
+        default=3600, ge=60, description="Сессия дольше в `completing` считается брошенной (процесс упал при сборке)"
+    )
+    multipart_sweep_interval_seconds: float = Field(
+        default=300.0, gt=0, description="Период уборки истекших и брошенных сессий загрузки"
+    )
+    multipart_sweep_batch_size: int = Field(default=100, ge=1, description="Сессий на один проход уборки")
+    stream_upload_part_size_bytes: int = Field(
+        default=8 * 1024 * 1024,
+        ge=5 * 1024 * 1024,
+        le=64 * 1024 * 1024,
+        description="Часть multipart при потоковой загрузке через API",
+    )
+    stream_upload_parallel_parts: int = Field(
+        default=3, ge=1, le=16, description="Сколько частей одной потоковой загрузки отправляется параллельно"
+    )
+    proxy_chunk_size_bytes: int = Field(
+        default=1024 * 1024,
+        ge=64 * 1024,
+        le=16 * 1024 * 1024,
+        description="Размер куска при потоковой отдаче объекта через API",
+    )
+    verify_batch_size: int = Field(default=200, ge=1, description="Ассетов на одну проверку в хранилище")
+    verify_concurrency: int = Field(default=16, ge=1, description="Параллельных stat-запросов при проверке")
+    verify_max_attempts: int = Field(
+        default=5, ge=1, description="Отказов stat (кроме «нет объекта»), после которых ассет получает `failed`"
+    )
+    verify_lease_seconds: int = Field(
+        default=300, ge=30, description="На сколько проверка забирает ассеты; должно хватать на stat всей пачки"
+    )
+    verify_interval_seconds: float = Field(
+        default=5.0, gt=0, description="Период опроса непроверенных ассетов (attach будит проверку сразу)"
+    )
 
     model_config = SettingsConfigDict(env_prefix="STORAGE_", env_file_encoding="utf-8")
 
 
+class MediaSettings(BaseSettings):
+    ffmpeg_path: str = Field(default="ffmpeg")
+    ffprobe_path: str = Field(default="ffprobe")
+    probe_timeout_seconds: float = Field(default=120.0, gt=0)
+    thumbnail_width: int = Field(default=480, ge=16, description="Ширина превью; высота по пропорциям")
+    proxy_height: int = Field(default=720, ge=144, description="Высота прокси-версии видео")
+    proxy_crf: int = Field(default=23, ge=0, le=51, description="Качество x264 прокси-версии (меньше — лучше)")
+    proxy_preset: str = Field(default="veryfast", description="Пресет x264: скорость против размера")
+    source_url_ttl_seconds: int = Field(
+        default=6 * 3600, ge=60, description="Срок ссылки, по которой ffmpeg читает исходник из хранилища"
+    )
+    io_timeout_seconds: float = Field(
+        default=60.0, gt=0, description="Таймаут чтения исходника по ссылке (ffmpeg -rw_timeout)"
+    )
+    stall_timeout_seconds: float = Field(
+        default=300.0, gt=0, description="Транскодинг без прогресса дольше этого считается зависшим"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="MEDIA_", env_file_encoding="utf-8")
+
+
+class CacheSettings(BaseSettings):
+    redis_url: str | None = Field(
+        default=None, description="Общий Redis для кешей; без него кеши только in-process"
+    )
+    presigned_max_entries: int = Field(default=10_000, ge=1)
+    presigned_url_ttl_seconds: int = Field(default=3600, gt=0, description="Срок жизни ссылки на скачивание")
+    presigned_refresh_margin_seconds: int = Field(
+        default=900, ge=0, description="За сколько до истечения ссылки запись вытесняется из кеша"
+    )
+    users_max_entries: int = Field(default=10_000, ge=1)
+    users_ttl_seconds: int = Field(default=300, gt=0, description="Страховочный TTL записи о пользователе")
+    users_sync_interval_seconds: float = Field(
+        default=2.0, gt=0, description="Период опроса счетчика изменений пользователей"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_", env_file_encoding="utf-8")
+
+
+class ApiSettings(BaseSettings):
+    compression_min_size: int = Field(default=1024, ge=0, description="Ответы меньше этого размера не сжимаются")
+    gzip_level: int = Field(default=6, ge=1, le=9)
+    brotli_quality: int = Field(default=4, ge=0, le=11)
+
+    model_config = SettingsConfigDict(env_prefix="API_", env_file_encoding="utf-8")
+
+
 class ExternalAPISettings(BaseSettings):
     meta_app_id: str | None = Field(default=None)
     meta_app_secret: str | None = Field(default=None)
@@ -41,6 +206,14 @@ class SecuritySettings(BaseSettings):
     secret_key: str = Field(default="dev-secret-key")
     algorithm: str = Field(default="HS256")
     access_token_expire_minutes: int = Field(default=60)
+    hash_workers: int = Field(default=4, ge=1, description="Потоки для хеширования и проверки паролей")
+    hash_max_pending: int = Field(
+        default=64, ge=1, description="Сколько проверок может ждать в очереди до отказа с 503"
+    )
+    token_cache_max_entries: int = Field(default=50_000, ge=1, description="Проверенные токены в кеше")
+    token_cache_max_ttl_seconds: int = Field(
+        default=300, ge=0, description="Верхняя граница жизни записи; 0 отключает кеш"
+    )
 
     model_config = SettingsConfigDict(env_prefix="AUTH_", env_file_encoding="utf-8")
 
@@ -48,9 +221,20 @@ class SecuritySettings(BaseSettings):
 class DemoUserSettings(BaseSettings):
     admin_email: str = Field(default="admin@example.com")
     admin_password: str = Field(default="admin123")
+    admin_password_hash: str | None = Field(
+        default=None, description="Готовый хеш пароля администратора; иначе хешируется при первом входе"
+    )
 
     model_config = SettingsConfigDict(env_prefix="DEMO_", env_file_encoding="utf-8")
 
+    @field_validator("admin_password_hash", mode="before")
+    @classmethod
+    def _empty_hash_is_unset(cls, value: object) -> object:
+        # `DEMO_ADMIN_PASSWORD_HASH=` в .env означает «не задан», а не пустой хеш
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
 
 class AppSettings(BaseSettings):
     environment: str = Field(default="local")
@@ -59,6 +243,9 @@ class AppSettings(BaseSettings):
     temporal: TemporalSettings = TemporalSettings()
     database: DatabaseSettings = DatabaseSettings()
     storage: StorageSettings = StorageSettings()
+    media: MediaSettings = MediaSettings()
+    cache: CacheSettings = CacheSettings()
+    api: ApiSettings = ApiSettings()
     external_api: ExternalAPISettings = ExternalAPISettings()
     security: SecuritySettings = SecuritySettings()
     demo_user: DemoUserSettings = DemoUserSettings()
@@ -1,18 +1,42 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from functools import partial
+from typing import Any, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge, Histogram
 
 from config.settings import settings
 
+T = TypeVar("T")
+
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256", "bcrypt"],
     deprecated="auto",
 )
 
+HASH_PENDING = Gauge("password_hash_pending", "Операции с паролями в очереди или в работе")
+HASH_RUNNING = Gauge("password_hash_running", "Операции с паролями, выполняемые прямо сейчас")
+HASH_REJECTED = Counter("password_hash_rejected_total", "Отказы из-за переполненной очереди")
+HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds",
+    "Ожидание свободного потока хеширования",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+_executor: ThreadPoolExecutor | None = None
+_pending = 0
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Очередь проверки паролей переполнена; запрос нужно повторить позже."""
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,6 +46,74 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.security.hash_workers,
+            thread_name_prefix="password-hash",
+        )
+    return _executor
+
+
+def _timed(func: Callable[[], T], queued_at: float) -> T:
+    HASH_QUEUE_SECONDS.observe(time.perf_counter() - queued_at)
+    HASH_RUNNING.inc()
+    try:
+        return func()
+    finally:
+        HASH_RUNNING.dec()
+
+
+async def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    """Выполняет CPU-тяжелую операцию в пуле, отказывая сверх лимита очереди."""
+    global _pending
+    if _pending >= settings.security.hash_max_pending:
+        HASH_REJECTED.inc()
+        raise PasswordHasherBusyError("Password hashing queue is full")
+    _pending += 1
+    HASH_PENDING.inc()
+    loop = asyncio.get_running_loop()
+    try:
+        future = _get_executor().submit(partial(_timed, partial(func, *args), time.perf_counter()))
+    except BaseException:
+        _release_pending()
+        raise
+
+    def on_done(_: Future) -> None:
+        # Вызывается из потока пула; счетчик принадлежит event loop
+        try:
+            loop.call_soon_threadsafe(_release_pending)
+        except RuntimeError:
+            pass  # loop уже закрыт
+
+    # Слот освобождается, когда задача завершилась (или снята из очереди) в пуле,
+    # а не когда отменен ожидающий запрос: иначе лимит недосчитывал бы работу
+    future.add_done_callback(on_done)
+    return await asyncio.wrap_future(future)
+
+
+def _release_pending() -> None:
+    global _pending
+    _pending -= 1
+    HASH_PENDING.dec()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+
+async def close_password_hasher() -> None:
+    global _executor
+    if _executor is not None:
+        await asyncio.to_thread(_executor.shutdown, wait=True)
+        _executor = None
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.security.access_token_expire_minutes))
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from redis.exceptions import RedisError
+
+from config.logging import get_logger
+from config.settings import settings
+from infrastructure.cache.memory import TTLCache
+from infrastructure.cache.shared import get_redis
+from infrastructure.storage.minio_client import create_presigned_get
+
+logger = get_logger(__name__)
+
+_REDIS_PREFIX = "presigned-get:"
+
+
+class PresignedURLCache:
+    """Кеш подписанных GET-ссылок по `object_key`.
+
+    Запись живет `url_ttl - refresh_margin`, поэтому клиент всегда получает
+    ссылку, действующую еще как минимум `refresh_margin` секунд. Локальный
+    LRU опционально подкреплен общим Redis, чтобы воркеры делили подписи.
+    """
+
+    def __init__(self, *, maxsize: int, url_ttl: int, refresh_margin: int) -> None:
+        self.url_ttl = url_ttl
+        self.entry_ttl = max(url_ttl - refresh_margin, 0)
+        self._local: TTLCache[str, str] = TTLCache(
+            "presigned_get", maxsize=maxsize, ttl=self.entry_ttl
+        )
+
+    async def get_url(self, *, bucket: str, object_key: str) -> str:
+        url = self._local.get(object_key)
+        if url is not None:
+            return url
+        url, ttl = await self._get_shared(object_key)
+        if url is None:
+            url = await create_presigned_get(
+                bucket=bucket, object_key=object_key, expires=timedelta(seconds=self.url_ttl)
+            )
+            ttl = self.entry_ttl
+            await self._set_shared(object_key, url)
+        # Запись из Redis могла быть создана другим воркером раньше, поэтому
+        # локально она живет не дольше, чем осталось жить в Redis.
+        self._local.set(object_key, url, ttl=ttl)
+        return url
+
+    async def invalidate(self, object_key: str) -> None:
+        self._local.pop(object_key)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(_REDIS_PREFIX + object_key)
+        except RedisError as exc:
+            logger.warning("presigned_cache_invalidate_failed", object_key=object_key, error=str(exc))
+
+    def stats(self) -> dict[str, int]:
+        return self._local.stats()
+
+    async def _get_shared(self, object_key: str) -> tuple[str | None, int]:
+        redis = get_redis()
+        if redis is None:
+            return None, 0
+        key = _REDIS_PREFIX + object_key
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                url, ttl = await pipe.get(key).ttl(key).execute()
+        except RedisError as exc:
+            logger.warning("presigned_cache_read_failed", object_key=object_key, error=str(exc))
+            return None, 0
+        if url is None or ttl <= 0:
+            return None, 0
+        return url, ttl
+
+    async def _set_shared(self, object_key: str, url: str) -> None:
+        redis = get_redis()
+        if redis is None or self.entry_ttl <= 0:
+            return
+        try:
+            await redis.set(_REDIS_PREFIX + object_key, url, ex=self.entry_ttl)
+        except RedisError as exc:
+            logger.warning("presigned_cache_write_failed", object_key=object_key, error=str(exc))
+
+
+presigned_url_cache = PresignedURLCache(
+    maxsize=settings.cache.presigned_max_entries,
+    url_ttl=settings.cache.presigned_url_ttl_seconds,
+    refresh_margin=settings.cache.presigned_refresh_margin_seconds,
+)
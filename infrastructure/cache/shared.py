@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from redis.asyncio import Redis
+
+from config.settings import settings
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis | None:
+    """Общий клиент Redis, если он настроен (`CACHE_REDIS_URL`)."""
+    global _redis
+    if _redis is None and settings.cache.redis_url:
+        _redis = Redis.from_url(settings.cache.redis_url, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
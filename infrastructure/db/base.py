@@ -1,6 +1,8 @@
 from typing import Any
 
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, declared_attr
+from sqlalchemy.sql.functions import now
 
 
 class Base(DeclarativeBase):
@@ -12,3 +14,13 @@ class Base(DeclarativeBase):
         return cls.__name__.lower()
 
     id: Any
+
+
+@compiles(now, "sqlite")
+def _sqlite_now(element: now, compiler: Any, **kw: Any) -> str:
+    """`now()` для локальной SQLite в формате хранения DateTime SQLAlchemy.
+
+    CURRENT_TIMESTAMP отдает секунды без дробной части, и строковое
+    сравнение с параметрами-datetime ломает keyset-пагинацию.
+    """
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
@@ -0,0 +1,81 @@
+"""Окружение Alembic: async-движок из настроек приложения, метаданные всех моделей."""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import Integer, pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Модели регистрируются в Base.metadata при импорте
+import apps.assets.models  # noqa: F401
+import apps.core.models  # noqa: F401
+import apps.intake.models  # noqa: F401
+import apps.script.models  # noqa: F401
+from config.settings import settings
+from infrastructure.db.base import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def _include_object(obj, name, type_, reflected, compare_to) -> bool:  # noqa: ANN001
+    # FTS5-таблицы SQLite (script_fts и ее теневые таблицы) создаются DDL-событиями, не моделями
+    if type_ == "table" and reflected and compare_to is None and name.startswith("script_fts"):
+        return False
+    # Индексы только для одного диалекта (`Index(...).ddl_if(dialect=...)`)
+    ddl_if = getattr(obj, "_ddl_if", None) if type_ == "index" and not reflected else None
+    return ddl_if is None or ddl_if.dialect in (None, context.get_context().dialect.name)
+
+
+def _compare_type(ctx, inspected_column, metadata_column, inspected_type, metadata_type) -> bool | None:  # noqa: ANN001
+    # SQLite хранит INTEGER и BIGINT одинаково (64 бита) — не считаем это расхождением
+    if ctx.dialect.name == "sqlite" and isinstance(inspected_type, Integer) and isinstance(metadata_type, Integer):
+        return False
+    return None
+
+
+def _url() -> str:
+    return config.get_main_option("sqlalchemy.url") or str(settings.database.url)
+
+
+def _configure(target_url: str, **kwargs) -> None:  # noqa: ANN003
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=_include_object,
+        # ALTER для SQLite выполняется пересозданием таблицы
+        render_as_batch=target_url.startswith("sqlite"),
+        compare_type=_compare_type,
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    """SQL-скрипт без подключения к БД (`alembic upgrade head --sql`)."""
+    url = _url()
+    _configure(url, url=url, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    _configure(str(connection.engine.url), connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,148 @@
+"""Initial schema: briefs, scripts, assets, users with indexes and foreign keys.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+META_RANGE_KEYS = ("duration", "rights_expiry")
+META_INDEXED_KEYS = ("duration", "aspect_ratio", "resolution", "codec", "locale", "rights_expiry")
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE script_fts USING fts5("
+    "title, outline, draft_text, content='script', content_rowid='rowid')",
+    "CREATE TRIGGER script_fts_ai AFTER INSERT ON script BEGIN "
+    "INSERT INTO script_fts(rowid, title, outline, draft_text) "
+    "VALUES (new.rowid, new.title, new.outline, new.draft_text); END",
+    "CREATE TRIGGER script_fts_ad AFTER DELETE ON script BEGIN "
+    "INSERT INTO script_fts(script_fts, rowid, title, outline, draft_text) "
+    "VALUES ('delete', old.rowid, old.title, old.outline, old.draft_text); END",
+    "CREATE TRIGGER script_fts_au AFTER UPDATE ON script BEGIN "
+    "INSERT INTO script_fts(script_fts, rowid, title, outline, draft_text) "
+    "VALUES ('delete', old.rowid, old.title, old.outline, old.draft_text); "
+    "INSERT INTO script_fts(rowid, title, outline, draft_text) "
+    "VALUES (new.rowid, new.title, new.outline, new.draft_text); END",
+)
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.create_table(
+        "useraccount",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("email", sa.String(length=320), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("role", sa.String(length=32), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "userdirectoryversion",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "brief",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("campaign_name", sa.String(), nullable=False),
+        sa.Column("objective", sa.String(), nullable=False),
+        sa.Column("target_audience", sa.String(), nullable=False),
+        sa.Column("launch_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("budget", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_by", sa.String(), nullable=False),
+        *_timestamps(),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_brief_created_at", "brief", ["created_at"])
+    op.create_index("ix_brief_status_created_at", "brief", ["status", "created_at"])
+
+    op.create_table(
+        "script",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("brief_id", sa.String(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("outline", sa.Text(), nullable=True),
+        sa.Column("draft_text", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("created_by", sa.String(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["brief_id"], ["brief.id"], name="fk_script_brief_id_brief", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_script_brief_id_created_at", "script", ["brief_id", "created_at"])
+    op.create_index("ix_script_status_created_at", "script", ["status", "created_at"])
+
+    op.create_table(
+        "asset",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("brief_id", sa.String(), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("content_type", sa.String(length=128), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=True),
+        sa.Column("object_key", sa.String(length=512), nullable=False),
+        sa.Column("url", sa.Text(), nullable=True),
+        sa.Column("type", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("meta", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=True),
+        sa.Column("created_by", sa.String(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["brief_id"], ["brief.id"], name="fk_asset_brief_id_brief", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_asset_brief_id_created_at", "asset", ["brief_id", "created_at"])
+    op.create_index("ix_asset_status_created_at", "asset", ["status", "created_at"])
+
+    # Полнотекстовый поиск и индексы по meta зависят от диалекта (см. модели)
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_script_search ON script USING gin (to_tsvector('simple', "
+            "coalesce(title, '') || ' ' || coalesce(outline, '') || ' ' || coalesce(draft_text, '')))"
+        )
+        op.execute("CREATE INDEX ix_asset_meta ON asset USING gin (meta jsonb_path_ops)")
+        for key in META_RANGE_KEYS:
+            op.execute(f"CREATE INDEX ix_asset_meta_{key}_pg ON asset (brief_id, (meta -> '{key}'))")
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        for key in META_INDEXED_KEYS:
+            op.execute(f"CREATE INDEX ix_asset_meta_{key} ON asset (brief_id, json_extract(meta, '$.{key}'))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS script_fts")
+    # Индексы удаляются вместе с таблицами
+    op.drop_table("asset")
+    op.drop_table("script")
+    op.drop_table("brief")
+    op.drop_table("userdirectoryversion")
+    op.drop_table("useraccount")
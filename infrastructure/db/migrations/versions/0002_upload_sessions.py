@@ -0,0 +1,73 @@
+"""Multipart upload sessions; asset.size widened to BIGINT for multi-GB masters.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "uploadsession",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("brief_id", sa.String(), nullable=False),
+        sa.Column("object_key", sa.String(length=512), nullable=False),
+        sa.Column("upload_id", sa.String(length=1024), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("content_type", sa.String(length=128), nullable=False),
+        sa.Column("type", sa.String(length=32), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("part_size", sa.BigInteger(), nullable=False),
+        sa.Column("part_count", sa.Integer(), nullable=False),
+        sa.Column("meta", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=True),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("asset_id", sa.String(), nullable=True),
+        sa.Column("created_by", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["brief_id"], ["brief.id"], name="fk_uploadsession_brief_id_brief", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_uploadsession_status_expires_at", "uploadsession", ["status", "expires_at"])
+
+    op.create_table(
+        "uploadpart",
+        sa.Column("session_id", sa.String(), nullable=False),
+        sa.Column("part_number", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("etag", sa.String(length=128), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["session_id"], ["uploadsession.id"], name="fk_uploadpart_session_id_uploadsession", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("session_id", "part_number"),
+    )
+
+    # В SQLite INTEGER и так 64-битный; пересоздание таблицы в batch-режиме
+    # потеряло бы индексы по выражениям на asset.meta
+    if op.get_bind().dialect.name != "sqlite":
+        op.alter_column("asset", "size", existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        op.alter_column("asset", "size", existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=True)
+    op.drop_table("uploadpart")
+    op.drop_table("uploadsession")
@@ -0,0 +1,42 @@
+"""Content hash on assets and reference-counted stored objects.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("asset", sa.Column("content_hash", sa.String(length=160), nullable=True))
+    op.create_index("ix_asset_content_hash", "asset", ["content_hash"])
+    op.create_table(
+        "storedobject",
+        sa.Column("object_key", sa.String(length=512), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("object_key"),
+    )
+    # Существующие ассеты: по ссылке на каждый объект
+    op.execute(
+        "INSERT INTO storedobject (object_key, ref_count, created_at) "
+        "SELECT object_key, count(*), min(created_at) FROM asset GROUP BY object_key"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("storedobject")
+    op.drop_index("ix_asset_content_hash", table_name="asset")
+    op.drop_column("asset", "content_hash")
@@ -0,0 +1,35 @@
+"""Client-supplied SHA-256 stored as claimed, not as a dedup source.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Хеши от attach и от потоковой загрузки хранились одинаково и уже не
+    # различимы; доверие снимается со всех, повторная загрузка через /upload
+    # снова даст хеш, посчитанный сервером.
+    op.execute(
+        "UPDATE asset SET content_hash = 'sha256-claimed:' || substr(content_hash, 8) "
+        "WHERE content_hash LIKE 'sha256:%'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "UPDATE asset SET content_hash = 'sha256:' || substr(content_hash, 16) "
+        "WHERE content_hash LIKE 'sha256-claimed:%'"
+    )
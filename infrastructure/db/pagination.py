@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import Select, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Курсор не удалось разобрать (подделан или устарел формат)."""
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    """Страница keyset-пагинации."""
+
+    items: list[T]
+    next_cursor: str | None
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Кодирует позицию `(created_at, id)` в непрозрачную строку."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Разбирает курсор, выданный `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def select_columns(model: Any, fields: Sequence[str]) -> Select[Any]:
+    """SELECT только запрошенных колонок (плюс ключ сортировки для курсора)."""
+    names = dict.fromkeys([*fields, "id", "created_at"])
+    return select(*(getattr(model, name) for name in names))
+
+
+async def paginate(
+    session: AsyncSession,
+    stmt: Select[Any],
+    model: Any,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    rows: bool = False,
+) -> Page[Any]:
+    """Выполняет `stmt` постранично по убыванию `(created_at, id)`.
+
+    Запрашивается `limit + 1` строк: лишняя строка лишь сигнализирует,
+    что следующая страница существует. С `rows=True` возвращаются `Row`
+    (для выборки отдельных колонок; среди них должны быть `id` и `created_at`).
+    """
+    sort_key = tuple_(model.created_at, model.id)
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        position = tuple_(
+            literal(created_at, model.created_at.type), literal(row_id, model.id.type)
+        )
+        stmt = stmt.where(sort_key < position)
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    res = await session.execute(stmt)
+    items = list(res.all() if rows else res.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return Page(items=items, next_cursor=next_cursor)
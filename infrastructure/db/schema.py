@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config.logging import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+
+class SchemaVersionError(RuntimeError):
+    """Схема БД отстает от миграций в коде."""
+
+
+def alembic_config() -> Config:
+    """Конфигурация Alembic без alembic.ini — не зависит от рабочего каталога."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+def _current_heads(connection: Connection) -> set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+async def verify_schema(engine: AsyncEngine) -> None:
+    """Сверяет ревизию БД с head миграций; сами миграции при старте не выполняются.
+
+    Схему обновляет отдельный шаг деплоя (`alembic upgrade head`), поэтому
+    параллельный старт реплик не гоняется за DDL. Неизвестная коду ревизия
+    (БД уже мигрирована более новой версией при раскатке) — только предупреждение.
+    """
+    script = ScriptDirectory.from_config(alembic_config())
+    expected = set(script.get_heads())
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_heads)
+    if current == expected:
+        return
+    known = {rev for rev in current if _is_known(script, rev)}
+    if current and known != current:
+        logger.warning("db_schema_ahead", current=sorted(current), expected=sorted(expected))
+        return
+    raise SchemaVersionError(
+        f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(expected)}; "
+        "run `alembic upgrade head`"
+    )
+
+
+def _is_known(script: ScriptDirectory, revision: str) -> bool:
+    try:
+        return script.get_revision(revision) is not None
+    except CommandError:
+        return False
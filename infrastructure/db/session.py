@@ -1,5 +1,6 @@
 from collections.abc import AsyncIterator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from config.settings import settings
@@ -13,9 +14,18 @@ def get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
         _engine = create_async_engine(str(settings.database.url), echo=False)
+        if _engine.dialect.name == "sqlite":
+            event.listen(_engine.sync_engine, "connect", _sqlite_foreign_keys)
     return _engine
 
 
+def _sqlite_foreign_keys(dbapi_connection, _record) -> None:  # noqa: ANN001
+    # В SQLite внешние ключи (и ON DELETE CASCADE) включаются на каждом соединении
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     """Возвращает фабрику сессий."""
     global _session_factory
@@ -1,49 +1,311 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from functools import partial
+from typing import Any, TypeVar
 
+import certifi
+import urllib3
 from minio import Minio
-from minio.commonconfig import Tags
+from minio.commonconfig import ENABLED, Filter
+from minio.datatypes import Object, Part
 from minio.error import S3Error
+from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
+from urllib3 import BaseHTTPResponse
+from urllib3.util import Retry, Timeout
 
+from config.logging import get_logger
 from config.settings import settings
 
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Коды S3Error, означающие, что объекта нет (а не временный сбой хранилища)
+MISSING_OBJECT_CODES = frozenset({"NoSuchKey", "NoSuchObject", "NoSuchBucket"})
+
+_http: urllib3.PoolManager | None = None
+_client: Minio | None = None
+_executor: ThreadPoolExecutor | None = None
+
 
 def get_minio_client() -> Minio:
-    endpoint = settings.storage.endpoint_url.replace("http://", "").replace("https://", "")
-    secure = settings.storage.endpoint_url.startswith("https://")
-    return Minio(
-        endpoint,
-        access_key=settings.storage.access_key,
-        secret_key=settings.storage.secret_key,
-        secure=secure,
+    """Общий на процесс клиент MinIO с собственным пулом соединений."""
+    global _client, _http
+    if _client is None:
+        endpoint = settings.storage.endpoint_url.replace("http://", "").replace("https://", "")
+        secure = settings.storage.endpoint_url.startswith("https://")
+        _http = urllib3.PoolManager(
+            timeout=Timeout(
+                connect=settings.storage.timeout_seconds,
+                read=settings.storage.timeout_seconds,
+            ),
+            maxsize=settings.storage.max_pool_connections,
+            block=False,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+            retries=Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        )
+        _client = Minio(
+            endpoint,
+            access_key=settings.storage.access_key,
+            secret_key=settings.storage.secret_key,
+            secure=secure,
+            region=settings.storage.region,
+            http_client=_http,
+        )
+    return _client
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """Ограниченный пул потоков для блокирующих вызовов S3."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.storage.executor_max_workers,
+            thread_name_prefix="storage",
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Выполняет синхронный вызов S3 в пуле хранилища, не блокируя event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_storage_executor(), partial(func, *args, **kwargs))
+
+
+async def init_storage() -> None:
+    """Создает клиент и пул при старте приложения и проверяет бакет ассетов."""
+    get_minio_client()
+    get_storage_executor()
+    await ensure_bucket_exists(settings.storage.bucket_assets)
+    # Служебные объекты Temporal в бакете ассетов удаляет само хранилище
+    await set_expiry_rules(
+        settings.storage.bucket_assets,
+        {
+            settings.temporal.payload_offload_prefix: settings.temporal.payload_retention_days,
+            settings.temporal.activity_cache_prefix: settings.temporal.activity_cache_retention_days,
+        },
     )
 
 
-def ensure_bucket_exists(bucket: str) -> None:
+async def close_storage() -> None:
+    """Дожидается фоновых вызовов и закрывает соединения."""
+    global _client, _http, _executor
+    if _executor is not None:
+        await asyncio.to_thread(_executor.shutdown, wait=True)
+    if _http is not None:
+        _http.clear()
+    _client = _http = _executor = None
+
+
+def _ensure_bucket_exists(bucket: str) -> None:
     client = get_minio_client()
     found = client.bucket_exists(bucket)
     if not found:
         client.make_bucket(bucket)
 
 
-def create_presigned_put(
+async def ensure_bucket_exists(bucket: str) -> None:
+    await run_blocking(_ensure_bucket_exists, bucket)
+
+
+def _set_expiry_rules(bucket: str, days_by_prefix: dict[str, int]) -> None:
+    client = get_minio_client()
+    current = client.get_bucket_lifecycle(bucket)
+    # Правила с чужими id (заведенные вручную) сохраняются как есть
+    rules = [
+        rule
+        for rule in (current.rules if current else [])
+        if not (rule.rule_id or "").startswith("expire:")
+    ]
+    rules += [
+        Rule(
+            ENABLED,
+            rule_filter=Filter(prefix=prefix),
+            rule_id=f"expire:{prefix}",
+            expiration=Expiration(days=days),
+        )
+        for prefix, days in days_by_prefix.items()
+        if days > 0
+    ]
+    if rules:
+        client.set_bucket_lifecycle(bucket, LifecycleConfig(rules))
+    elif current is not None:
+        client.delete_bucket_lifecycle(bucket)
+
+
+async def set_expiry_rules(bucket: str, days_by_prefix: dict[str, int]) -> None:
+    """Правила lifecycle бакета: объекты под префиксом удаляются через N дней (0 — правило снимается).
+
+    Хранилище без поддержки lifecycle не мешает старту: ошибка только логируется.
+    """
+    try:
+        await run_blocking(_set_expiry_rules, bucket, days_by_prefix)
+    except S3Error as exc:
+        logger.warning("bucket_lifecycle_failed", bucket=bucket, code=exc.code, error=str(exc))
+
+
+async def create_presigned_put(
     *,
     bucket: str,
     object_key: str,
     expires: timedelta = timedelta(minutes=15),
-    content_type: str | None = None,
 ) -> str:
+    return await run_blocking(
+        get_minio_client().presigned_put_object, bucket, object_key, expires=expires
+    )
+
+
+def _presign_puts(bucket: str, object_keys: list[str], expires: timedelta) -> list[str]:
     client = get_minio_client()
-    params = {"response-content-type": content_type} if content_type else None
-    return client.presigned_put_object(bucket, object_key, expires=expires, response_headers=params)
+    return [client.presigned_put_object(bucket, key, expires=expires) for key in object_keys]
 
 
-def create_presigned_get(
+async def create_presigned_puts(
+    *,
+    bucket: str,
+    object_keys: list[str],
+    expires: timedelta = timedelta(minutes=15),
+) -> list[str]:
+    """Пакетная подпись PUT: одна задача в пуле на весь список, подпись локальная (HMAC)."""
+    return await run_blocking(_presign_puts, bucket, object_keys, expires)
+
+
+async def create_presigned_get(
     *,
     bucket: str,
     object_key: str,
     expires: timedelta = timedelta(minutes=60),
 ) -> str:
+    return await run_blocking(
+        get_minio_client().presigned_get_object, bucket, object_key, expires=expires
+    )
+
+
+async def stat_object(*, bucket: str, object_key: str) -> Object:
+    return await run_blocking(get_minio_client().stat_object, bucket, object_key)
+
+
+async def remove_object(*, bucket: str, object_key: str) -> None:
+    await run_blocking(get_minio_client().remove_object, bucket, object_key)
+
+
+async def open_object(*, bucket: str, object_key: str, offset: int = 0, length: int = 0) -> BaseHTTPResponse:
+    """GET объекта (или диапазона) без чтения тела; тело читается через `iter_object`."""
+    return await run_blocking(get_minio_client().get_object, bucket, object_key, offset=offset, length=length)
+
+
+async def iter_object(response: BaseHTTPResponse, chunk_size: int) -> AsyncIterator[bytes]:
+    """Тело ответа кусками по `chunk_size`: каждое чтение — отдельная задача в пуле,
+    в памяти не больше одного куска на передачу. Соединение закрывается и при обрыве."""
+    try:
+        while chunk := await run_blocking(response.read, chunk_size):
+            yield chunk
+    finally:
+        # Недочитанное соединение нельзя вернуть в пул как есть: сначала close
+        response.close()
+        response.release_conn()
+
+
+# Multipart-загрузка. Публичного API в minio-py для нее нет, поэтому
+# используются низкоуровневые методы клиента (S3 CreateMultipartUpload и т.д.).
+MAX_MULTIPART_PARTS = 10_000
+
+
+async def create_multipart_upload(*, bucket: str, object_key: str, content_type: str) -> str:
+    """Начинает multipart-загрузку и возвращает `upload_id`."""
+    return await run_blocking(
+        get_minio_client()._create_multipart_upload, bucket, object_key, {"Content-Type": content_type}
+    )
+
+
+def _presign_upload_parts(
+    bucket: str, object_key: str, upload_id: str, part_numbers: list[int], expires: timedelta
+) -> dict[int, str]:
+    client = get_minio_client()
+    return {
+        number: client.get_presigned_url(
+            "PUT",
+            bucket,
+            object_key,
+            expires=expires,
+            extra_query_params={"partNumber": str(number), "uploadId": upload_id},
+        )
+        for number in part_numbers
+    }
+
+
+async def presign_upload_parts(
+    *,
+    bucket: str,
+    object_key: str,
+    upload_id: str,
+    part_numbers: list[int],
+    expires: timedelta = timedelta(hours=1),
+) -> dict[int, str]:
+    """Presigned PUT для частей; все подписи — одна задача в пуле, без сети."""
+    return await run_blocking(_presign_upload_parts, bucket, object_key, upload_id, part_numbers, expires)
+
+
+def _list_uploaded_parts(bucket: str, object_key: str, upload_id: str) -> list[Part]:
     client = get_minio_client()
-    return client.presigned_get_object(bucket, object_key, expires=expires)
+    parts: list[Part] = []
+    marker: str | None = None
+    while True:
+        result = client._list_parts(bucket, object_key, upload_id, max_parts=1000, part_number_marker=marker)
+        parts.extend(result.parts)
+        if not result.is_truncated:
+            return parts
+        marker = result.next_part_number_marker
+
+
+async def list_uploaded_parts(*, bucket: str, object_key: str, upload_id: str) -> list[Part]:
+    """Части, фактически принятые хранилищем (с ETag и размером)."""
+    return await run_blocking(_list_uploaded_parts, bucket, object_key, upload_id)
+
+
+async def upload_part(*, bucket: str, object_key: str, upload_id: str, part_number: int, data: bytes) -> Part:
+    etag = await run_blocking(get_minio_client()._upload_part, bucket, object_key, data, None, upload_id, part_number)
+    return Part(part_number, etag)
+
+
+def _get_object_bytes(bucket: str, object_key: str) -> bytes:
+    response = get_minio_client().get_object(bucket, object_key)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def get_object_bytes(*, bucket: str, object_key: str) -> bytes:
+    """Объект целиком в память — только для небольших объектов."""
+    return await run_blocking(_get_object_bytes, bucket, object_key)
+
+
+async def put_object_bytes(*, bucket: str, object_key: str, data: bytes, content_type: str) -> str | None:
+    """Объект одним PUT из буфера в памяти (без multipart); возвращает ETag."""
+    result = await run_blocking(
+        get_minio_client()._put_object, bucket, object_key, data, {"Content-Type": content_type}
+    )
+    return result.etag
+
+
+async def complete_multipart_upload(
+    *, bucket: str, object_key: str, upload_id: str, parts: list[Part]
+) -> str | None:
+    """Собирает объект из частей (в порядке номеров); возвращает ETag объекта."""
+    ordered = sorted(parts, key=lambda part: part.part_number)
+    result = await run_blocking(
+        get_minio_client()._complete_multipart_upload, bucket, object_key, upload_id, ordered
+    )
+    return result.etag
+
+
+async def abort_multipart_upload(*, bucket: str, object_key: str, upload_id: str) -> None:
+    await run_blocking(get_minio_client()._abort_multipart_upload, bucket, object_key, upload_id)
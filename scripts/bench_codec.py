@@ -0,0 +1,155 @@
+"""Замер кодека payload Temporal: размер в истории против стоимости encode/decode.
+
+    python scripts/bench_codec.py
+    python scripts/bench_codec.py --assets 20000 --repeat 50 --json
+
+Payload строятся стандартным конвертером из типичных входов workflow:
+черновик сценария, список ассетов брифа, метаданные медиапайплайна.
+Хранилище не нужно: выгрузка отключена, колонка `offload` показывает,
+ушел бы payload в хранилище при текущем `TEMPORAL_PAYLOAD_OFFLOAD_THRESHOLD_BYTES`.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import temporalio.converter
+
+from config.settings import settings
+from workflows.codec import ZLIB_ENCODING, ZSTD_ENCODING, CompressionCodec, zstandard
+from workflows.media import AssetItem
+
+WORDS = (
+    "кадр сцена герой бренд продукт крупный план голос за кадром переход музыка финал логотип "
+    "зритель кампания слоган улыбка город утро движение свет камера монтаж титр призыв"
+).split()
+
+
+def _script_draft(rng: random.Random, scenes: int) -> dict:
+    return {
+        "title": "Весенняя кампания",
+        "scenes": [
+            {
+                "number": n,
+                "duration": rng.randint(3, 12),
+                "visual": " ".join(rng.choices(WORDS, k=40)),
+                "voiceover": " ".join(rng.choices(WORDS, k=30)),
+            }
+            for n in range(1, scenes + 1)
+        ],
+    }
+
+
+def _asset_items(rng: random.Random, count: int) -> list[AssetItem]:
+    brief_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    items = []
+    for _ in range(count):
+        asset_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        kind = rng.choice(("video", "image", "audio"))
+        items.append(
+            AssetItem(id=asset_id, object_key=f"{brief_id}/{asset_id}/clip", type=kind, content_type=f"{kind}/mp4")
+        )
+    return items
+
+
+def _asset_meta(rng: random.Random, count: int) -> list[dict]:
+    return [
+        {
+            "duration": round(rng.uniform(1, 120), 3),
+            "resolution": rng.choice(("1920x1080", "1080x1920", "3840x2160")),
+            "aspect_ratio": rng.choice(("16:9", "9:16")),
+            "codec": rng.choice(("h264", "hevc", "aac")),
+            "thumbnail_key": f"derived/{uuid.UUID(int=rng.getrandbits(128))}/thumb.jpg",
+        }
+        for _ in range(count)
+    ]
+
+
+def _samples(assets: int) -> dict[str, object]:
+    rng = random.Random(42)
+    return {
+        "brief_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "script_draft": _script_draft(rng, scenes=30),
+        "asset_page_100": _asset_items(rng, 100),
+        f"asset_list_{assets}": _asset_items(rng, assets),
+        f"asset_meta_{assets}": _asset_meta(rng, assets),
+    }
+
+
+async def _measure(codec: CompressionCodec, payload, repeat: int) -> dict:
+    encode_times, decode_times = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        [encoded] = await codec.encode([payload])
+        encode_times.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        [decoded] = await codec.decode([encoded])
+        decode_times.append(time.perf_counter() - started)
+    assert decoded == payload
+    return {
+        "history_bytes": encoded.ByteSize(),
+        "encode_ms": round(statistics.median(encode_times) * 1000, 3),
+        "decode_ms": round(statistics.median(decode_times) * 1000, 3),
+    }
+
+
+async def run(assets: int, repeat: int) -> list[dict]:
+    converter = temporalio.converter.default().payload_converter
+    threshold = settings.temporal.payload_offload_threshold_bytes
+    codecs: dict[str, bytes | None] = {"none": None, "zlib": ZLIB_ENCODING}
+    if zstandard is not None:
+        codecs["zstd"] = ZSTD_ENCODING
+    rows = []
+    for name, value in _samples(assets).items():
+        [payload] = converter.to_payloads([value])
+        for codec_name, encoding in codecs.items():
+            # Выгрузка выключена и порог бесконечен: меряется только сжатие
+            codec = CompressionCodec(
+                compression=encoding,
+                compression_threshold=settings.temporal.payload_compression_threshold_bytes,
+                offload_threshold=sys.maxsize,
+            )
+            result = await _measure(codec, payload, repeat)
+            rows.append(
+                {
+                    "payload": name,
+                    "codec": codec_name,
+                    "raw_bytes": payload.ByteSize(),
+                    **result,
+                    "ratio": round(payload.ByteSize() / result["history_bytes"], 2),
+                    "offload": result["history_bytes"] > threshold,
+                }
+            )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=5000, help="размер большого списка ассетов")
+    parser.add_argument("--repeat", type=int, default=20, help="повторов на замер (берется медиана)")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.assets, args.repeat))
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    columns = ("payload", "codec", "raw_bytes", "history_bytes", "ratio", "encode_ms", "decode_ms", "offload")
+    widths = [max(len(col), *(len(str(row[col])) for row in rows)) for col in columns]
+    print("  ".join(col.ljust(width) for col, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[col]).ljust(width) for col, width in zip(columns, widths)))
+
+
+if __name__ == "__main__":
+    main()
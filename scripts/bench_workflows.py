@@ -0,0 +1,264 @@
+"""Пропускная способность worker на CampaignWorkflow при разных настройках очередей.
+
+    python scripts/bench_workflows.py --workflows 200 --concurrency 50
+    python scripts/bench_workflows.py --activity-slots 20,100 --cpu-workers 4,16 --output bench.json
+    python scripts/bench_workflows.py --address localhost:7233
+
+Без `--address` поднимается локальный Temporal dev server
+(`WorkflowEnvironment.start_local`; бинарник скачивается SDK или задается
+`--dev-server-path`). Workflow и worker — настоящие (`build_workers`, кодек
+payload), activity подменены заглушками с теми же именами и заданной
+задержкой: меряется оркестрация, а не БД и ffmpeg. Синхронные заглушки
+CPU-очереди выполняются в пуле потоков.
+
+Для каждой комбинации настроек выводится JSON: задержка старт→результат
+(p50/p95/p99), workflow и activity в секунду.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from temporalio import activity
+from temporalio.client import Client
+from temporalio.testing import WorkflowEnvironment
+
+from config.settings import settings
+from workflows.activities import AssetPage
+from workflows.campaign import CampaignWorkflow, PipelineOptions
+from workflows.client import data_converter
+from workflows.media import AssetItem, MediaInfo, derived_key
+from workflows.queues import CPU, DEFAULT
+from workflows.workers.worker import build_workers
+
+
+class StandInActivities:
+    """Activity пайплайна без внешних зависимостей: только задержка и счетчик."""
+
+    def __init__(self, assets_per_brief: int, io_ms: float, cpu_ms: float) -> None:
+        self.assets_per_brief = assets_per_brief
+        self.io_seconds = io_ms / 1000
+        self.cpu_seconds = cpu_ms / 1000
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _count(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    @activity.defn(name="intake_activity")
+    async def intake(self, brief_id: str) -> str:
+        self._count()
+        await asyncio.sleep(self.io_seconds)
+        return f"processed:{brief_id}"
+
+    @activity.defn(name="list_brief_assets")
+    async def list_brief_assets(self, brief_id: str, cursor: str | None, limit: int) -> AssetPage:
+        self._count()
+        await asyncio.sleep(self.io_seconds)
+        start = int(cursor or 0)
+        end = min(start + limit, self.assets_per_brief)
+        items = [
+            AssetItem(id=f"{brief_id}-{n}", object_key=f"{brief_id}/{n}", type="video", content_type="video/mp4")
+            for n in range(start, end)
+        ]
+        return AssetPage(items=items, next_cursor=str(end) if end < self.assets_per_brief else None)
+
+    @activity.defn(name="save_asset_media")
+    async def save_asset_media(self, asset_id: str, meta: dict) -> bool:
+        self._count()
+        await asyncio.sleep(self.io_seconds)
+        return True
+
+    @activity.defn(name="probe_asset")
+    def probe_asset(self, item: AssetItem) -> MediaInfo:
+        self._count()
+        time.sleep(self.cpu_seconds)
+        return MediaInfo(duration=10.0, width=1920, height=1080, codec="h264", has_video=True)
+
+    @activity.defn(name="thumbnail_asset")
+    def thumbnail_asset(self, item: AssetItem, media: MediaInfo) -> str:
+        self._count()
+        time.sleep(self.cpu_seconds)
+        return derived_key(item.id, "thumb.jpg")
+
+    @activity.defn(name="transcode_asset")
+    def transcode_asset(self, item: AssetItem, media: MediaInfo) -> str:
+        self._count()
+        time.sleep(self.cpu_seconds)
+        return derived_key(item.id, "proxy.mp4")
+
+    def queues(self) -> dict:
+        return {
+            DEFAULT: [self.intake, self.list_brief_assets, self.save_asset_media],
+            CPU: [self.probe_asset, self.thumbnail_asset, self.transcode_asset],
+        }
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    if len(latencies) < 2:
+        value = round(latencies[0] * 1000, 2) if latencies else 0.0
+        return {"p50": value, "p95": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 2),
+        "p95": round(cuts[94] * 1000, 2),
+        "p99": round(cuts[98] * 1000, 2),
+        "max": round(max(latencies) * 1000, 2),
+    }
+
+
+async def _drive(
+    client: Client, count: int, concurrency: int, options: PipelineOptions, run_id: str
+) -> tuple[list[float], int]:
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failed = 0
+
+    async def one(n: int) -> None:
+        nonlocal failed
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await client.execute_workflow(
+                    CampaignWorkflow.run,
+                    args=[f"brief-{n}", options],
+                    id=f"bench-{run_id}-{n}",
+                    task_queue=settings.temporal.task_queue,
+                )
+            except Exception:
+                failed += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(n) for n in range(count)))
+    return latencies, failed
+
+
+async def _run_config(client: Client, args: argparse.Namespace, config: dict) -> dict:
+    cfg = settings.temporal
+    run_id = uuid.uuid4().hex[:8]
+    # Своя пара очередей на прогон: задачи прошлых прогонов не смешиваются
+    cfg.task_queue, cfg.cpu_task_queue = f"bench-{run_id}", f"bench-{run_id}-cpu"
+    cfg.worker_queues = ["default", "cpu"]
+    cfg.cpu_executor = "thread"
+    cfg.max_concurrent_activities = config["activity_slots"]
+    cfg.max_concurrent_workflow_tasks = config["workflow_task_slots"]
+    cfg.cpu_executor_workers = config["cpu_workers"]
+
+    stand_in = StandInActivities(args.assets, args.io_ms, args.cpu_ms)
+    options = PipelineOptions(batch_size=args.batch_size)
+    with contextlib.ExitStack() as pools:
+        async with contextlib.AsyncExitStack() as running:
+            for w in build_workers(client, pools, stand_in.queues()):
+                await running.enter_async_context(w)
+            if args.warmup:
+                await _drive(client, args.warmup, args.concurrency, options, f"{run_id}-warmup")
+            calls_before = stand_in.calls
+            started = time.perf_counter()
+            latencies, failed = await _drive(client, args.workflows, args.concurrency, options, run_id)
+            elapsed = time.perf_counter() - started
+            activities = stand_in.calls - calls_before
+    return {
+        "config": config,
+        "workflows": args.workflows,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 3),
+        "workflows_per_s": round(len(latencies) / elapsed, 2),
+        "activities": activities,
+        "activities_per_s": round(activities / elapsed, 2),
+        "latency_ms": _percentiles(latencies),
+    }
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.address:
+        env = None
+        client = await Client.connect(
+            args.address, namespace=settings.temporal.namespace, data_converter=data_converter()
+        )
+    else:
+        env = await WorkflowEnvironment.start_local(
+            data_converter=data_converter(), dev_server_existing_path=args.dev_server_path
+        )
+        client = env.client
+    configs = [
+        {"activity_slots": a, "workflow_task_slots": w, "cpu_workers": c}
+        for a, w, c in itertools.product(args.activity_slots, args.workflow_task_slots, args.cpu_workers)
+    ]
+    try:
+        results = [await _run_config(client, args, config) for config in configs]
+    finally:
+        if env is not None:
+            await env.shutdown()
+    return {
+        "benchmark": "campaign_workflow",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "server": args.address or "local-dev-server",
+            "python": platform.python_version(),
+            "temporalio": metadata.version("temporalio"),
+            "payload_compression": settings.temporal.payload_compression,
+        },
+        "params": {
+            "workflows": args.workflows,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "assets_per_brief": args.assets,
+            "batch_size": args.batch_size,
+            "io_ms": args.io_ms,
+            "cpu_ms": args.cpu_ms,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--address", help="готовый Temporal host:port вместо локального dev server")
+    parser.add_argument("--dev-server-path", help="путь к бинарнику temporal CLI (без скачивания)")
+    parser.add_argument("--workflows", type=int, default=100, help="сколько workflow на комбинацию")
+    parser.add_argument("--concurrency", type=int, default=20, help="одновременно запущенных workflow")
+    parser.add_argument("--warmup", type=int, default=5, help="workflow до замера")
+    parser.add_argument("--assets", type=int, default=10, help="ассетов в брифе")
+    parser.add_argument("--batch-size", type=int, default=100, help="PipelineOptions.batch_size")
+    parser.add_argument("--io-ms", type=float, default=5.0, help="задержка async-activity, мс")
+    parser.add_argument("--cpu-ms", type=float, default=20.0, help="задержка activity CPU-очереди, мс")
+    parser.add_argument(
+        "--activity-slots", type=_int_list, default=[100], help="max_concurrent_activities, через запятую"
+    )
+    parser.add_argument(
+        "--workflow-task-slots", type=_int_list, default=[100], help="max_concurrent_workflow_tasks, через запятую"
+    )
+    parser.add_argument("--cpu-workers", type=_int_list, default=[4], help="размер пула CPU-очереди, через запятую")
+    parser.add_argument("--output", type=Path, help="записать JSON в файл вместо stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
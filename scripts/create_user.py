@@ -0,0 +1,53 @@
+"""Создание пользователя в БД или вывод хеша пароля для `DEMO_ADMIN_PASSWORD_HASH`.
+
+    python scripts/create_user.py user@example.com "Full Name" producer
+    python scripts/create_user.py --hash-only
+"""
+
+import argparse
+import asyncio
+import getpass
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from apps.core.user_service import user_service
+from infrastructure.auth.security import get_password_hash
+from infrastructure.db.session import get_engine, get_session_factory
+
+
+async def _create(email: str, full_name: str, role: str, password: str) -> None:
+    async with get_session_factory()() as session:
+        user = await user_service.create_user(
+            session,
+            email=email,
+            full_name=full_name,
+            role=role,  # type: ignore[arg-type]
+            hashed_password=get_password_hash(password),
+        )
+    await get_engine().dispose()
+    print(f"created {user.email} ({user.role})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("email", nargs="?")
+    parser.add_argument("full_name", nargs="?")
+    parser.add_argument("role", nargs="?", choices=["marketing", "producer", "legal", "brand", "admin"])
+    parser.add_argument("--hash-only", action="store_true", help="только вывести хеш пароля")
+    args = parser.parse_args()
+
+    password = getpass.getpass("Password: ")
+    if args.hash_only:
+        print(get_password_hash(password))
+        return
+    if not (args.email and args.full_name and args.role):
+        parser.error("email, full_name and role are required")
+    asyncio.run(_create(args.email, args.full_name, args.role, password))
+
+
+if __name__ == "__main__":
+    main()
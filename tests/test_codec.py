@@ -0,0 +1,164 @@
+import json
+import os
+
+import pytest
+from temporalio.api.common.v1 import Payload
+
+import workflows.codec as codec_module
+from workflows.codec import (
+    RAW_ENCODING,
+    REFERENCE_ENCODING,
+    ZLIB_ENCODING,
+    ZSTD_ENCODING,
+    CompressionCodec,
+    PayloadTooLarge,
+    resolve_compression,
+    zstandard,
+)
+
+PREFIX = "temporal-payloads/"
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Хранилище в памяти вместо бакета: ключ -> байты."""
+    objects: dict[str, bytes] = {}
+
+    async def put_object_bytes(*, bucket, object_key, data, content_type):
+        objects[object_key] = data
+
+    async def get_object_bytes(*, bucket, object_key):
+        return objects[object_key]
+
+    monkeypatch.setattr(codec_module, "put_object_bytes", put_object_bytes)
+    monkeypatch.setattr(codec_module, "get_object_bytes", get_object_bytes)
+    return objects
+
+
+def make_codec(compression=ZLIB_ENCODING, offload_threshold=64 * 1024, offload_enabled=True):
+    return CompressionCodec(
+        compression=compression,
+        compression_threshold=1024,
+        offload_threshold=offload_threshold,
+        offload_enabled=offload_enabled,
+        bucket="assets",
+        prefix=PREFIX,
+    )
+
+
+def json_payload(value) -> Payload:
+    return Payload(metadata={"encoding": b"json/plain"}, data=json.dumps(value).encode())
+
+
+def compressible(size: int) -> Payload:
+    return json_payload(["asset"] * (size // 9))
+
+
+async def roundtrip(codec: CompressionCodec, payload: Payload) -> Payload:
+    [encoded] = await codec.encode([payload])
+    [decoded] = await codec.decode([encoded])
+    assert decoded == payload
+    return encoded
+
+
+async def test_small_payload_passes_through(storage):
+    payload = json_payload({"brief_id": "b-1"})
+    encoded = await roundtrip(make_codec(), payload)
+    assert encoded is payload
+    assert not storage
+
+
+async def test_compressible_payload_is_compressed(storage):
+    payload = compressible(20_000)
+    encoded = await roundtrip(make_codec(), payload)
+    assert encoded.metadata["encoding"] == ZLIB_ENCODING
+    assert encoded.ByteSize() < payload.ByteSize()
+    assert not storage
+
+
+async def test_incompressible_payload_is_left_as_is(storage):
+    payload = Payload(metadata={"encoding": b"binary/plain"}, data=os.urandom(20_000))
+    encoded = await roundtrip(make_codec(), payload)
+    assert encoded is payload
+
+
+async def test_compression_disabled(storage):
+    payload = compressible(20_000)
+    encoded = await roundtrip(make_codec(compression=None), payload)
+    assert encoded is payload
+
+
+async def test_large_payload_is_offloaded_by_content_hash(storage):
+    payload = Payload(metadata={"encoding": b"binary/plain"}, data=os.urandom(100_000))
+    codec = make_codec()
+    encoded = await roundtrip(codec, payload)
+    assert encoded.metadata["encoding"] == REFERENCE_ENCODING
+    # Случайные байты не сжимаются: в хранилище лежит сериализованный payload как есть
+    assert encoded.metadata["stored-encoding"] == RAW_ENCODING
+    object_key = encoded.data.decode()
+    assert object_key.startswith(PREFIX)
+    assert int(encoded.metadata["stored-size"]) == len(storage[object_key])
+    # Повтор того же payload не создает вторую копию
+    [again] = await codec.encode([payload])
+    assert again.data == encoded.data
+    assert list(storage) == [object_key]
+
+
+async def test_offloaded_payload_is_stored_compressed(storage):
+    # hex сжимается примерно вдвое, но остается крупнее порога выгрузки
+    payload = json_payload(os.urandom(200_000).hex())
+    encoded = await roundtrip(make_codec(), payload)
+    assert encoded.metadata["encoding"] == REFERENCE_ENCODING
+    assert encoded.metadata["stored-encoding"] == ZLIB_ENCODING
+    assert int(encoded.metadata["stored-size"]) < payload.ByteSize()
+
+
+async def test_payload_at_offload_threshold_stays_in_history(storage):
+    payload = Payload(metadata={"encoding": b"binary/plain"}, data=os.urandom(5_000))
+    codec = make_codec(compression=None, offload_threshold=payload.ByteSize())
+    encoded = await roundtrip(codec, payload)
+    assert encoded is payload
+    assert not storage
+
+
+async def test_offload_disabled_rejects_large_payload(storage):
+    payload = Payload(metadata={"encoding": b"binary/plain"}, data=os.urandom(100_000))
+    with pytest.raises(PayloadTooLarge):
+        await make_codec(offload_enabled=False).encode([payload])
+    assert not storage
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        json_payload({"legacy": True}),
+        Payload(metadata={"encoding": b"binary/null"}),
+        Payload(metadata={"encoding": b"binary/plain"}, data=os.urandom(50_000)),
+    ],
+)
+async def test_payloads_written_before_codec_decode_unchanged(storage, payload):
+    [decoded] = await make_codec().decode([payload])
+    assert decoded is payload
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard не установлен")
+async def test_zstd_roundtrip(storage):
+    encoded = await roundtrip(make_codec(compression=ZSTD_ENCODING), compressible(20_000))
+    assert encoded.metadata["encoding"] == ZSTD_ENCODING
+
+
+@pytest.mark.skipif(zstandard is not None, reason="zstandard установлен")
+async def test_zstd_payload_without_zstandard_fails_loudly(storage):
+    with pytest.raises(RuntimeError):
+        await make_codec().decode([Payload(metadata={"encoding": ZSTD_ENCODING}, data=b"\x28\xb5\x2f\xfd")])
+
+
+def test_resolve_compression():
+    assert resolve_compression("none") is None
+    assert resolve_compression("zlib") == ZLIB_ENCODING
+    assert resolve_compression("auto") == (ZSTD_ENCODING if zstandard is not None else ZLIB_ENCODING)
+    if zstandard is None:
+        with pytest.raises(RuntimeError):
+            resolve_compression("zstd")
+    else:
+        assert resolve_compression("zstd") == ZSTD_ENCODING
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from api.conditional import (
+    RangeNotSatisfiable,
+    is_not_modified,
+    is_precondition_failed,
+    make_etag,
+    requested_range,
+)
+
+UPDATED_AT = datetime(2026, 3, 1, 12, 30, 15, 250_000, tzinfo=timezone.utc)
+LAST_MODIFIED = "Sun, 01 Mar 2026 12:30:15 GMT"
+ETAG = make_etag("asset-1", UPDATED_AT)
+SIZE = 1000
+
+
+def make_request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_make_etag_is_strong_and_ignores_timezone_of_naive_value():
+    naive = UPDATED_AT.replace(tzinfo=None)
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert make_etag("asset-1", naive) == ETAG
+    assert make_etag("asset-1", UPDATED_AT, version=2) != ETAG
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=900-", (900, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=999-999", (999, 999)),
+        ("BYTES = 0-0", (0, 0)),
+    ],
+)
+def test_requested_range_satisfiable(header, expected):
+    assert requested_range(make_request(range=header), SIZE, ETAG, UPDATED_AT) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "bytes=0-10,20-30",  # несколько диапазонов
+        "bytes=-",
+        "bytes=abc-",
+        "bytes=10-5",
+        "items=0-10",
+        "bytes 0-10",
+        "bytes=1-2-3",
+    ],
+)
+def test_requested_range_ignores_unsupported_or_invalid(header):
+    assert requested_range(make_request(range=header), SIZE, ETAG, UPDATED_AT) is None
+
+
+@pytest.mark.parametrize(("header", "size"), [("bytes=1000-", SIZE), ("bytes=-0", SIZE), ("bytes=-10", 0)])
+def test_requested_range_not_satisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        requested_range(make_request(range=header), size, ETAG, UPDATED_AT)
+
+
+def test_requested_range_without_header():
+    assert requested_range(make_request(), SIZE, ETAG, UPDATED_AT) is None
+
+
+@pytest.mark.parametrize(
+    ("if_range", "expected"),
+    [
+        (ETAG, (0, 9)),
+        ('"other"', None),
+        # If-Range сравнивает строго: слабый тег не совпадает даже с тем же значением
+        (f"W/{ETAG}", None),
+        (LAST_MODIFIED, (0, 9)),
+        ("Sun, 01 Mar 2026 12:30:14 GMT", None),
+        ("not a date", None),
+    ],
+)
+def test_requested_range_if_range(if_range, expected):
+    request = make_request(range="bytes=0-9", if_range=if_range)
+    assert requested_range(request, SIZE, ETAG, UPDATED_AT) == expected
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({}, False),
+        ({"if_match": "*"}, False),
+        ({"if_match": ETAG}, False),
+        ({"if_match": f'"stale", {ETAG}'}, False),
+        ({"if_match": '"stale"'}, True),
+        ({"if_match": f"W/{ETAG}"}, True),
+        ({"if_unmodified_since": LAST_MODIFIED}, False),
+        ({"if_unmodified_since": "Sun, 01 Mar 2026 12:30:14 GMT"}, True),
+        ({"if_unmodified_since": "garbage"}, False),
+        # If-Match важнее If-Unmodified-Since
+        ({"if_match": ETAG, "if_unmodified_since": "Sun, 01 Mar 2026 12:00:00 GMT"}, False),
+    ],
+)
+def test_is_precondition_failed(headers, expected):
+    assert is_precondition_failed(make_request(**headers), ETAG, UPDATED_AT) is expected
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({}, False),
+        ({"if_none_match": "*"}, True),
+        ({"if_none_match": f"W/{ETAG}"}, True),
+        ({"if_none_match": '"a", "b"'}, False),
+        ({"if_modified_since": LAST_MODIFIED}, True),
+        ({"if_modified_since": "Sun, 01 Mar 2026 12:30:14 GMT"}, False),
+        # If-None-Match важнее If-Modified-Since
+        ({"if_none_match": '"a"', "if_modified_since": LAST_MODIFIED}, False),
+    ],
+)
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(make_request(**headers), ETAG, UPDATED_AT) is expected
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from temporalio import activity
+
+from apps.assets.service import asset_service
+from infrastructure.db.session import get_session_factory
+from workflows.media import MEDIA_TYPES, AssetItem
+
+
+@dataclass
+class AssetPage:
+    items: list[AssetItem]
+    next_cursor: str | None
+
+
+@activity.defn
+async def list_brief_assets(brief_id: str, cursor: str | None, limit: int) -> AssetPage:
+    """Страница медиаассетов брифа (keyset-курсор `asset_service.list`)."""
+    async with get_session_factory()() as session:
+        page = await asset_service.list(session, brief_id=brief_id, limit=limit, cursor=cursor)
+    items = [
+        AssetItem(id=obj.id, object_key=obj.object_key, type=obj.type, content_type=obj.content_type)
+        for obj in page.items
+        if obj.type in MEDIA_TYPES and obj.status != "missing"
+    ]
+    return AssetPage(items=items, next_cursor=page.next_cursor)
+
+
+@activity.defn
+async def save_asset_media(asset_id: str, meta: dict) -> bool:
+    """Дописывает результаты пайплайна в `Asset.meta`; False — ассет уже удален."""
+    async with get_session_factory()() as session:
+        return await asset_service.merge_meta(session, asset_id, meta)
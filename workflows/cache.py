@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import typing
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import temporalio.converter
+from minio.error import S3Error
+from temporalio import activity
+from temporalio.api.common.v1 import Payload
+from urllib3.exceptions import HTTPError
+
+from config.settings import settings
+from infrastructure.storage.minio_client import MISSING_OBJECT_CODES, get_minio_client, run_blocking
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Кеш результатов activity в бакете ассетов. Ключ — имя activity, версия
+# и SHA-256 входа в том виде, в каком его сериализует конвертер Temporal
+# (JSON с сортировкой ключей, то есть детерминированно). Хранилище, а не БД:
+# синхронные activity CPU-очереди работают в отдельных процессах без
+# event loop и сессии БД, а клиент хранилища есть в каждом процессе.
+# Кеш — только ускорение: любая ошибка хранилища означает промах.
+
+_converter = temporalio.converter.default().payload_converter
+_MISS = object()
+
+
+def input_fingerprint(args: tuple, kwargs: dict, context: Any = None) -> str:
+    hasher = hashlib.sha256()
+    for payload in _converter.to_payloads([context, *args, *(kwargs[k] for k in sorted(kwargs))]):
+        hasher.update(len(payload.data).to_bytes(8, "big"))
+        hasher.update(payload.data)
+    for name in sorted(kwargs):
+        hasher.update(name.encode())
+    return hasher.hexdigest()
+
+
+def cache_key(name: str, version: str, args: tuple, kwargs: dict, context: Any = None) -> str:
+    fingerprint = input_fingerprint(args, kwargs, context)
+    return f"{settings.temporal.activity_cache_prefix}{name}/v{version}/{fingerprint}"
+
+
+def _load(object_key: str, result_type: Any) -> Any:
+    try:
+        response = get_minio_client().get_object(settings.storage.bucket_assets, object_key)
+    except S3Error as exc:
+        if exc.code not in MISSING_OBJECT_CODES:
+            activity.logger.warning("Activity cache read failed: %s", exc)
+        return _MISS
+    except HTTPError as exc:
+        activity.logger.warning("Activity cache read failed: %s", exc)
+        return _MISS
+    try:
+        data = response.read()
+    except (HTTPError, OSError) as exc:
+        activity.logger.warning("Activity cache read failed: %s", exc)
+        return _MISS
+    finally:
+        response.close()
+        response.release_conn()
+    try:
+        return _converter.from_payloads([Payload.FromString(data)], [result_type])[0]
+    except Exception as exc:
+        # Битая или несовместимая запись: результат пересчитывается и перезаписывает ее
+        activity.logger.warning("Activity cache entry is unreadable, recomputing: %s: %s", object_key, exc)
+        _discard(object_key)
+        return _MISS
+
+
+def _discard(object_key: str) -> None:
+    try:
+        get_minio_client().remove_object(settings.storage.bucket_assets, object_key)
+    except (S3Error, HTTPError) as exc:
+        activity.logger.warning("Activity cache cleanup failed: %s", exc)
+
+
+def _store(object_key: str, result: Any) -> None:
+    data = _converter.to_payloads([result])[0].SerializeToString()
+    try:
+        get_minio_client()._put_object(
+            settings.storage.bucket_assets, object_key, data, {"Content-Type": "application/x-protobuf"}
+        )
+    except (S3Error, HTTPError) as exc:
+        activity.logger.warning("Activity cache write failed: %s", exc)
+
+
+def cached_activity(*, version: str = "1", context: Callable[[], Any] | None = None) -> Callable[[F], F]:
+    """Возвращает сохраненный результат activity, если вход не изменился.
+
+    Применяется под `@activity.defn` к activity, повтор которых дорог и
+    результат которых определяется только входом (медиа-шаги: источник
+    по ключу объекта неизменен). `version` меняется вместе с логикой
+    activity, чтобы старые результаты перестали совпадать; `context` —
+    настройки, от которых зависит результат, они входят в отпечаток. Отключается
+    `TEMPORAL_ACTIVITY_CACHE_ENABLED=false`.
+    """
+
+    def decorate(fn: F) -> F:
+        name = fn.__name__
+        result_type = typing.get_type_hints(fn).get("return")
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not settings.temporal.activity_cache_enabled:
+                    return await fn(*args, **kwargs)
+                object_key = cache_key(name, version, args, kwargs, context() if context else None)
+                cached = await run_blocking(_load, object_key, result_type)
+                if cached is not _MISS:
+                    activity.logger.info("Activity result served from cache: %s", object_key)
+                    return cached
+                result = await fn(*args, **kwargs)
+                await run_blocking(_store, object_key, result)
+                return result
+
+            return typing.cast(F, async_wrapper)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not settings.temporal.activity_cache_enabled:
+                return fn(*args, **kwargs)
+            object_key = cache_key(name, version, args, kwargs, context() if context else None)
+            cached = _load(object_key, result_type)
+            if cached is not _MISS:
+                activity.logger.info("Activity result served from cache: %s", object_key)
+                return cached
+            result = fn(*args, **kwargs)
+            _store(object_key, result)
+            return result
+
+        return typing.cast(F, wrapper)
+
+    return decorate
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass, field
 from datetime import timedelta
 
 from temporalio import activity, workflow
+from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError, ChildWorkflowError
+
+with workflow.unsafe.imports_passed_through():
+    from workflows.activities import list_brief_assets, save_asset_media
+    from workflows.media import AssetItem, MediaInfo, probe_asset, thumbnail_asset, transcode_asset
+    from workflows.queues import CPU, task_queue
+
+RETRY_POLICY = RetryPolicy(maximum_attempts=3)
 
 
 @activity.defn
@@ -11,17 +22,170 @@ async def intake_activity(brief_id: str) -> str:
     return f"processed:{brief_id}"
 
 
+@dataclass
+class PipelineOptions:
+    """Параметры фан-аута. Передаются во входе workflow, а не читаются из
+    настроек worker: иначе replay зависел бы от конфигурации процесса."""
+
+    batch_size: int = 100
+    max_parallel_batches: int = 10
+    max_parallel_assets: int = 20
+    # После стольких партий за один run история продолжается через continue-as-new
+    batches_per_run: int = 50
+
+
+@dataclass
+class PipelineProgress:
+    """Состояние, переносимое через continue-as-new."""
+
+    intake: str
+    cursor: str | None = None
+    batches: int = 0
+    processed: int = 0
+    failed: int = 0
+
+
+@dataclass
+class BatchResult:
+    processed: int = 0
+    failed: int = 0
+    failed_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class CampaignResult:
+    brief_id: str
+    intake: str
+    processed: int
+    failed: int
+
+
+@workflow.defn
+class AssetBatchWorkflow:
+    """Медиапайплайн партии ассетов: probe, затем превью и прокси параллельно.
+
+    Отдельный child workflow на партию держит историю родителя маленькой,
+    а партии брифа обрабатываются разными worker одновременно.
+    """
+
+    @workflow.run
+    async def run(self, items: list[AssetItem], max_parallel: int) -> BatchResult:
+        slots = asyncio.Semaphore(max_parallel)
+        outcomes = await asyncio.gather(*(self._process(item, slots) for item in items))
+        failed_ids = [item.id for item, ok in zip(items, outcomes) if not ok]
+        return BatchResult(processed=len(items) - len(failed_ids), failed=len(failed_ids), failed_ids=failed_ids)
+
+    async def _process(self, item: AssetItem, slots: asyncio.Semaphore) -> bool:
+        async with slots:
+            try:
+                media: MediaInfo = await workflow.execute_activity(
+                    probe_asset,
+                    item,
+                    task_queue=task_queue(CPU),
+                    start_to_close_timeout=timedelta(minutes=5),
+                    retry_policy=RETRY_POLICY,
+                )
+                steps = {}
+                if media.has_video:
+                    steps["thumbnail_key"] = workflow.execute_activity(
+                        thumbnail_asset,
+                        args=[item, media],
+                        task_queue=task_queue(CPU),
+                        start_to_close_timeout=timedelta(minutes=10),
+                        retry_policy=RETRY_POLICY,
+                    )
+                if media.has_video and item.type == "video":
+                    steps["proxy_key"] = workflow.execute_activity(
+                        transcode_asset,
+                        args=[item, media],
+                        task_queue=task_queue(CPU),
+                        start_to_close_timeout=timedelta(hours=6),
+                        # ffmpeg шлет прогресс постоянно: без heartbeat зависший процесс заметен за минуты, а не часы
+                        heartbeat_timeout=timedelta(minutes=2),
+                        retry_policy=RETRY_POLICY,
+                    )
+                keys = dict(zip(steps, await asyncio.gather(*steps.values())))
+                await workflow.execute_activity(
+                    save_asset_media,
+                    args=[item.id, {**media.as_meta(), **keys}],
+                    start_to_close_timeout=timedelta(minutes=1),
+                    retry_policy=RETRY_POLICY,
+                )
+            except ActivityError as exc:
+                workflow.logger.warning("Asset pipeline failed for %s: %s", item.id, exc.cause or exc)
+                return False
+            return True
+
+
 @workflow.defn
 class CampaignWorkflow:
-    """Базовый каркас workflow кампании."""
+    """Кампания: прием брифа и медиапайплайн по всем его ассетам.
+
+    Ассеты читаются страницами по `batch_size`; каждая страница уходит в
+    child workflow, одновременно идет не больше `max_parallel_batches`.
+    Время обработки брифа определяется числом worker, а не числом ассетов;
+    история ограничена continue-as-new после `batches_per_run` партий.
+    """
 
     @workflow.run
-    async def run(self, brief_id: str) -> str:  # noqa: D401
-        """Основной сценарий работы skeleton."""
-        result = await workflow.execute_activity(
-            intake_activity,
-            brief_id,
-            start_to_close_timeout=timedelta(minutes=5),
-            retry_policy=workflow.RetryPolicy(maximum_attempts=3),
+    async def run(
+        self, brief_id: str, options: PipelineOptions | None = None, progress: PipelineProgress | None = None
+    ) -> CampaignResult:
+        options = options or PipelineOptions()
+        if progress is None:
+            intake = await workflow.execute_activity(
+                intake_activity,
+                brief_id,
+                start_to_close_timeout=timedelta(minutes=5),
+                retry_policy=RETRY_POLICY,
+            )
+            progress = PipelineProgress(intake=intake)
+
+        slots = asyncio.Semaphore(options.max_parallel_batches)
+        batches: list[asyncio.Task[BatchResult]] = []
+        started = 0
+        while True:
+            page = await workflow.execute_activity(
+                list_brief_assets,
+                args=[brief_id, progress.cursor, options.batch_size],
+                start_to_close_timeout=timedelta(minutes=1),
+                retry_policy=RETRY_POLICY,
+            )
+            if page.items:
+                await slots.acquire()
+                batches.append(asyncio.create_task(self._run_batch(progress.batches, page.items, options, slots)))
+                progress.batches += 1
+                started += 1
+            progress.cursor = page.next_cursor
+            if progress.cursor is None:
+                break
+            if started >= options.batches_per_run or workflow.info().is_continue_as_new_suggested():
+                await self._collect(batches, progress)
+                workflow.continue_as_new(args=[brief_id, options, progress])
+
+        await self._collect(batches, progress)
+        return CampaignResult(
+            brief_id=brief_id, intake=progress.intake, processed=progress.processed, failed=progress.failed
         )
-        return result
+
+    async def _run_batch(
+        self, number: int, items: list[AssetItem], options: PipelineOptions, slots: asyncio.Semaphore
+    ) -> BatchResult:
+        try:
+            return await workflow.execute_child_workflow(
+                AssetBatchWorkflow.run,
+                args=[items, options.max_parallel_assets],
+                id=f"{workflow.info().workflow_id}-batch-{number}",
+            )
+        except ChildWorkflowError as exc:
+            workflow.logger.warning("Asset batch %s failed: %s", number, exc.cause or exc)
+            return BatchResult(failed=len(items), failed_ids=[item.id for item in items])
+        finally:
+            slots.release()
+
+    @staticmethod
+    async def _collect(batches: list[asyncio.Task[BatchResult]], progress: PipelineProgress) -> None:
+        for result in await asyncio.gather(*batches):
+            progress.processed += result.processed
+            progress.failed += result.failed
+        batches.clear()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import dataclasses
+
+import temporalio.converter
+from temporalio.client import Client
+
+from config.settings import settings
+from workflows.codec import CompressionCodec
+
+
+def data_converter() -> temporalio.converter.DataConverter:
+    """Стандартный конвертер с кодеком payload проекта.
+
+    Кодек должен совпадать у всех, кто читает и пишет историю: и у worker,
+    и у API, запускающего workflow, — иначе payload не декодируются.
+    """
+    return dataclasses.replace(temporalio.converter.default(), payload_codec=CompressionCodec.from_settings())
+
+
+async def connect_client() -> Client:
+    """Подключение к Temporal по настройкам с кодеком payload."""
+    return await Client.connect(
+        f"{settings.temporal.hostname}:{settings.temporal.port}",
+        namespace=settings.temporal.namespace,
+        data_converter=data_converter(),
+    )
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import zlib
+from collections.abc import Sequence
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+from config.settings import settings
+from infrastructure.storage.minio_client import get_object_bytes, put_object_bytes, run_blocking
+
+try:  # zstandard — необязательная зависимость
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+# Кодек оборачивает уже сериализованный Payload целиком (вместе с его
+# metadata), поэтому decode восстанавливает исходный payload байт в байт.
+# Payload без этих кодировок (записанные до включения кодека) проходят как есть.
+ZSTD_ENCODING = b"binary/zstd"
+ZLIB_ENCODING = b"binary/zlib"
+RAW_ENCODING = b"binary/protobuf"
+REFERENCE_ENCODING = b"binary/storage-ref"
+
+
+class PayloadTooLarge(ValueError):
+    """Payload не помещается в историю, а выгрузка в хранилище выключена."""
+
+
+def resolve_compression(name: str) -> bytes | None:
+    """Кодировка для настройки `TEMPORAL_PAYLOAD_COMPRESSION`."""
+    if name == "none":
+        return None
+    if name == "zlib" or (name == "auto" and zstandard is None):
+        return ZLIB_ENCODING
+    if zstandard is None:
+        raise RuntimeError("TEMPORAL_PAYLOAD_COMPRESSION=zstd requires the zstandard package")
+    return ZSTD_ENCODING
+
+
+def compress(data: bytes, encoding: bytes) -> bytes:
+    if encoding == ZSTD_ENCODING:
+        return zstandard.ZstdCompressor(level=3).compress(data)  # type: ignore[union-attr]
+    return zlib.compress(data, 6)
+
+
+def decompress(data: bytes, encoding: bytes) -> bytes:
+    if encoding == ZSTD_ENCODING:
+        if zstandard is None:
+            raise RuntimeError("zstd payload received, but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == ZLIB_ENCODING:
+        return zlib.decompress(data)
+    return data
+
+
+class CompressionCodec(PayloadCodec):
+    """Сжимает крупные payload и выгружает в хранилище те, что велики и после сжатия.
+
+    Payload от `compression_threshold` байт сжимаются, если это дает выигрыш.
+    Больше `offload_threshold` — кладутся в бакет ассетов под ключом из
+    SHA-256 содержимого (повторы не плодят копий), в истории остается только
+    ключ. Выгруженные объекты нужны для replay, пока жива история workflow:
+    чистить их стоит lifecycle-правилом бакета не раньше retention namespace.
+    """
+
+    def __init__(
+        self,
+        *,
+        compression: bytes | None,
+        compression_threshold: int,
+        offload_threshold: int,
+        offload_enabled: bool = True,
+        bucket: str = "",
+        prefix: str = "",
+    ) -> None:
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.offload_threshold = offload_threshold
+        self.offload_enabled = offload_enabled
+        self.bucket = bucket
+        self.prefix = prefix
+
+    @classmethod
+    def from_settings(cls) -> CompressionCodec:
+        cfg = settings.temporal
+        return cls(
+            compression=resolve_compression(cfg.payload_compression),
+            compression_threshold=cfg.payload_compression_threshold_bytes,
+            offload_threshold=cfg.payload_offload_threshold_bytes,
+            offload_enabled=cfg.payload_offload_enabled,
+            bucket=settings.storage.bucket_assets,
+            prefix=cfg.payload_offload_prefix,
+        )
+
+    async def encode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        return [await self._encode(payload) for payload in payloads]
+
+    async def decode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        return [await self._decode(payload) for payload in payloads]
+
+    async def _encode(self, payload: Payload) -> Payload:
+        if payload.ByteSize() < self.compression_threshold:
+            return payload
+        data, encoding = payload.SerializeToString(), RAW_ENCODING
+        if self.compression is not None:
+            # Крупные буферы сжимаются вне event loop: zlib и zstd отпускают GIL
+            if len(data) > self.offload_threshold:
+                compressed = await run_blocking(compress, data, self.compression)
+            else:
+                compressed = compress(data, self.compression)
+            if len(compressed) < len(data):
+                data, encoding = compressed, self.compression
+        if len(data) <= self.offload_threshold:
+            return payload if encoding == RAW_ENCODING else Payload(metadata={"encoding": encoding}, data=data)
+        if not self.offload_enabled:
+            raise PayloadTooLarge(
+                f"Payload of {len(data)} bytes exceeds {self.offload_threshold} bytes and offload is disabled"
+            )
+        object_key = f"{self.prefix}{hashlib.sha256(data).hexdigest()}"
+        await put_object_bytes(
+            bucket=self.bucket, object_key=object_key, data=data, content_type="application/octet-stream"
+        )
+        return Payload(
+            metadata={
+                "encoding": REFERENCE_ENCODING,
+                "stored-encoding": encoding,
+                "stored-size": str(len(data)).encode(),
+            },
+            data=object_key.encode(),
+        )
+
+    async def _decode(self, payload: Payload) -> Payload:
+        encoding = payload.metadata.get("encoding")
+        if encoding == REFERENCE_ENCODING:
+            data = await get_object_bytes(bucket=self.bucket, object_key=payload.data.decode())
+            data = await run_blocking(decompress, data, payload.metadata["stored-encoding"])
+            return Payload.FromString(data)
+        if encoding in (ZSTD_ENCODING, ZLIB_ENCODING):
+            return Payload.FromString(decompress(payload.data, encoding))
+        return payload
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import subprocess
+import tempfile
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import timedelta
+from fractions import Fraction
+from pathlib import Path
+
+from temporalio import activity
+from temporalio.exceptions import ApplicationError, CancelledError
+
+from config.settings import settings
+from infrastructure.storage.minio_client import get_minio_client
+from workflows.cache import cached_activity
+
+# CPU-тяжелые activity медиапайплайна — синхронные функции для CPU-очереди:
+# worker выполняет их в пуле процессов, клиент хранилища создается в каждом
+# процессе свой. ffmpeg читает исходник из хранилища по presigned URL, без
+# скачивания на диск worker; на диск пишутся только результаты.
+
+MEDIA_TYPES = ("image", "audio", "video")
+
+
+@dataclass
+class AssetItem:
+    """Ассет во входе пайплайна: только то, что нужно activity."""
+
+    id: str
+    object_key: str
+    type: str
+    content_type: str
+
+
+@dataclass
+class MediaInfo:
+    duration: float | None = None
+    width: int | None = None
+    height: int | None = None
+    codec: str | None = None
+    has_video: bool = False
+
+    def as_meta(self) -> dict:
+        """Поля для `Asset.meta` в формате индексируемых ключей (см. META_INDEXED_KEYS)."""
+        meta: dict = {}
+        if self.duration is not None:
+            meta["duration"] = round(self.duration, 3)
+        if self.width and self.height:
+            ratio = Fraction(self.width, self.height)
+            meta["resolution"] = f"{self.width}x{self.height}"
+            meta["aspect_ratio"] = f"{ratio.numerator}:{ratio.denominator}"
+        if self.codec:
+            meta["codec"] = self.codec
+        return meta
+
+
+def derived_key(asset_id: str, name: str) -> str:
+    """Ключ производного объекта (превью, прокси) ассета."""
+    return f"derived/{asset_id}/{name}"
+
+
+def _source_url(object_key: str) -> str:
+    return get_minio_client().presigned_get_object(
+        settings.storage.bucket_assets,
+        object_key,
+        expires=timedelta(seconds=settings.media.source_url_ttl_seconds),
+    )
+
+
+def _input_options() -> list[str]:
+    """Таймаут чтения исходника по сети: без него оборванное соединение вешает ffmpeg."""
+    return ["-rw_timeout", str(int(settings.media.io_timeout_seconds * 1_000_000))]
+
+
+def _progress_lines(proc: subprocess.Popen, stall_timeout: float) -> Iterator[str]:
+    """Строки stdout процесса; пока их нет, проверяются отмена activity и зависание.
+
+    Чтение с ожиданием не дольше секунды (select), поэтому замолчавший ffmpeg
+    не держит слот CPU-очереди бесконечно: после `stall_timeout` секунд без
+    вывода, как и при отмене, бросается исключение, и вызывающий убивает процесс.
+    """
+    assert proc.stdout is not None
+    fd = proc.stdout.fileno()
+    buffer = b""
+    last_output = time.monotonic()
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            if activity.is_cancelled():
+                raise CancelledError("Transcode cancelled")
+            if not selector.select(timeout=1.0):
+                if time.monotonic() - last_output > stall_timeout:
+                    raise ApplicationError(f"ffmpeg stalled: no progress for {stall_timeout:.0f}s")
+                continue
+            chunk = os.read(fd, 64 * 1024)
+            if not chunk:
+                if buffer:
+                    yield buffer.decode(errors="replace")
+                return
+            last_output = time.monotonic()
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                yield line.decode(errors="replace")
+
+
+def _run(cmd: list[str], timeout: float) -> str:
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False)
+    except subprocess.TimeoutExpired as exc:
+        raise ApplicationError(f"{Path(cmd[0]).name} timed out after {timeout:.0f}s") from exc
+    if result.returncode != 0:
+        # Битый или неподдерживаемый файл: повтор не поможет
+        raise ApplicationError(
+            f"{Path(cmd[0]).name} failed: {result.stderr.strip()[-500:]}", non_retryable=True
+        )
+    return result.stdout
+
+
+def _upload(local_path: Path, object_key: str, content_type: str) -> None:
+    get_minio_client().fput_object(
+        settings.storage.bucket_assets, object_key, str(local_path), content_type=content_type
+    )
+
+
+@activity.defn
+@cached_activity()
+def probe_asset(item: AssetItem) -> MediaInfo:
+    """Длительность, размер кадра и кодек по ffprobe."""
+    activity.heartbeat("probe")
+    output = _run(
+        [
+            settings.media.ffprobe_path,
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            *_input_options(),
+            _source_url(item.object_key),
+        ],
+        timeout=settings.media.probe_timeout_seconds,
+    )
+    data = json.loads(output or "{}")
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    main = video or audio or {}
+    duration = data.get("format", {}).get("duration")
+    return MediaInfo(
+        # У изображения «длительность» — это длительность одного кадра
+        duration=float(duration) if duration not in (None, "N/A") and item.type != "image" else None,
+        width=video.get("width") if video else None,
+        height=video.get("height") if video else None,
+        codec=main.get("codec_name"),
+        has_video=video is not None,
+    )
+
+
+@activity.defn
+@cached_activity(context=lambda: settings.media.thumbnail_width)
+def thumbnail_asset(item: AssetItem, media: MediaInfo) -> str:
+    """Превью JPEG: кадр на 10% длительности видео или само изображение."""
+    activity.heartbeat("thumbnail")
+    seek = ["-ss", f"{media.duration * 0.1:.3f}"] if media.duration else []
+    object_key = derived_key(item.id, "thumb.jpg")
+    with tempfile.TemporaryDirectory(prefix="thumb-") as tmp:
+        output = Path(tmp) / "thumb.jpg"
+        _run(
+            [
+                settings.media.ffmpeg_path,
+                "-nostdin", "-v", "error", "-y",
+                *seek,
+                *_input_options(),
+                "-i", _source_url(item.object_key),
+                "-frames:v", "1",
+                "-vf", f"scale={settings.media.thumbnail_width}:-2",
+                str(output),
+            ],
+            timeout=settings.media.probe_timeout_seconds,
+        )
+        _upload(output, object_key, "image/jpeg")
+    return object_key
+
+
+@activity.defn
+@cached_activity(
+    context=lambda: (settings.media.proxy_height, settings.media.proxy_crf, settings.media.proxy_preset)
+)
+def transcode_asset(item: AssetItem, media: MediaInfo) -> str:
+    """Прокси-версия H.264/AAC не выше `MEDIA_PROXY_HEIGHT`.
+
+    Прогресс ffmpeg (`-progress`) отправляется heartbeat-ом: по нему Temporal
+    видит, что долгая activity жива, и доставляет отмену — тогда ffmpeg
+    останавливается. Без вывода дольше `MEDIA_STALL_TIMEOUT_SECONDS` ffmpeg
+    считается зависшим и тоже останавливается, activity повторяется.
+    """
+    object_key = derived_key(item.id, "proxy.mp4")
+    with tempfile.TemporaryDirectory(prefix="proxy-") as tmp:
+        output = Path(tmp) / "proxy.mp4"
+        errors = Path(tmp) / "ffmpeg.log"
+        cmd = [
+            settings.media.ffmpeg_path,
+            "-nostdin", "-v", "error", "-y",
+            *_input_options(),
+            "-i", _source_url(item.object_key),
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-c:v", "libx264",
+            "-preset", settings.media.proxy_preset,
+            "-crf", str(settings.media.proxy_crf),
+            "-vf", f"scale=-2:'min({settings.media.proxy_height},ih)'",
+            "-c:a", "aac",
+            "-movflags", "+faststart",
+            "-progress", "pipe:1", "-nostats",
+            str(output),
+        ]
+        activity.heartbeat({"seconds": 0.0, "progress": 0.0})
+        with errors.open("w") as stderr, subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr) as proc:
+            try:
+                for line in _progress_lines(proc, settings.media.stall_timeout_seconds):
+                    key, _, value = line.strip().partition("=")
+                    if key == "out_time_us" and value.isdigit():
+                        seconds = int(value) / 1_000_000
+                        progress = min(seconds / media.duration, 1.0) if media.duration else None
+                        # SDK сам прореживает heartbeat, вызывать можно на каждой строке
+                        activity.heartbeat({"seconds": seconds, "progress": progress})
+            except BaseException:
+                # Отмена (в пуле потоков SDK бросает ее прямо в поток activity)
+                # или зависание: без kill выход из Popen ждал бы ffmpeg вечно
+                proc.kill()
+                raise
+            returncode = proc.wait()
+        if returncode != 0:
+            raise ApplicationError(
+                f"ffmpeg failed: {errors.read_text().strip()[-500:]}", non_retryable=True
+            )
+        _upload(output, object_key, "video/mp4")
+    return object_key
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from temporalio import workflow
+
+with workflow.unsafe.imports_passed_through():
+    from config.settings import settings
+
+QueueKind = Literal["default", "cpu"]
+
+# Workflow и легкие async-activity (БД, API) — в основной очереди;
+# синхронные CPU-тяжелые activity — в отдельной, ее worker выполняет их в пуле.
+DEFAULT: QueueKind = "default"
+CPU: QueueKind = "cpu"
+
+
+def task_queue(kind: QueueKind) -> str:
+    """Имя очереди Temporal по ее назначению (имена задаются в TemporalSettings)."""
+    return settings.temporal.cpu_task_queue if kind == CPU else settings.temporal.task_queue
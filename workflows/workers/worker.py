@@ -1,20 +1,39 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import multiprocessing
+import signal
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
 from typing import Any
 
 from temporalio import worker
 from temporalio.client import Client
+from temporalio.worker import SharedStateManager
 
 from config.settings import settings
 from config.logging import get_logger, setup_logging
-from workflows.campaign import CampaignWorkflow, intake_activity
+from infrastructure.storage.minio_client import close_storage
+from workflows.activities import list_brief_assets, save_asset_media
+from workflows.campaign import AssetBatchWorkflow, CampaignWorkflow, intake_activity
+from workflows.client import connect_client
+from workflows.media import probe_asset, thumbnail_asset, transcode_asset
+from workflows.queues import CPU, DEFAULT, QueueKind, task_queue
 
 
 setup_logging(settings.log_level)
 logger = get_logger(__name__)
 
+# Что обслуживает каждая очередь. Activity CPU-очереди — синхронные функции
+# (def, не async def): worker выполняет их в пуле, не блокируя event loop.
+QUEUE_WORKFLOWS: dict[QueueKind, list[type]] = {DEFAULT: [CampaignWorkflow, AssetBatchWorkflow], CPU: []}
+QUEUE_ACTIVITIES: dict[QueueKind, list[Callable[..., Any]]] = {
+    DEFAULT: [intake_activity, list_brief_assets, save_asset_media],
+    CPU: [probe_asset, thumbnail_asset, transcode_asset],
+}
+
 
 async def _connect_with_retry(
     factory: Callable[[], Any], *, retries: int | None = None
@@ -40,25 +59,93 @@ async def _connect_with_retry(
     raise RuntimeError("Unable to connect to Temporal") from last_error
 
 
+def _cpu_options(pools: contextlib.ExitStack) -> dict[str, Any]:
+    """Пул для CPU-очереди; закрывается вместе с `pools` после остановки worker."""
+    cfg = settings.temporal
+    shared_state_manager = None
+    if cfg.cpu_executor == "process":
+        executor = pools.enter_context(ProcessPoolExecutor(max_workers=cfg.cpu_executor_workers))
+        # Heartbeat и отмена activity в дочерних процессах идут через менеджер
+        manager = pools.enter_context(multiprocessing.Manager())
+        shared_state_manager = SharedStateManager.create_from_multiprocessing(manager)
+    else:
+        executor = pools.enter_context(
+            ThreadPoolExecutor(max_workers=cfg.cpu_executor_workers, thread_name_prefix="temporal-cpu")
+        )
+    return {
+        "activity_executor": executor,
+        "shared_state_manager": shared_state_manager,
+        # Не брать больше задач, чем мест в пуле: лишние ждали бы здесь,
+        # вместо того чтобы достаться свободному worker
+        "max_concurrent_activities": cfg.cpu_executor_workers,
+    }
+
+
+def build_workers(
+    client: Client,
+    pools: contextlib.ExitStack,
+    queue_activities: dict[QueueKind, list[Callable[..., Any]]] | None = None,
+) -> list[worker.Worker]:
+    """По worker на каждую очередь из `TEMPORAL_WORKER_QUEUES`.
+
+    `queue_activities` подменяет activity очередей (бенчмарк оркестрации).
+    """
+    cfg = settings.temporal
+    queue_activities = queue_activities or QUEUE_ACTIVITIES
+    workers = []
+    for kind in dict.fromkeys(cfg.worker_queues):
+        workflows, activities = QUEUE_WORKFLOWS[kind], queue_activities[kind]
+        if not workflows and not activities:
+            logger.warning("Task queue has nothing registered, skipping", task_queue=task_queue(kind))
+            continue
+        if kind == CPU:
+            options = _cpu_options(pools)
+        else:
+            options = {"max_concurrent_activities": cfg.max_concurrent_activities}
+        workers.append(
+            worker.Worker(
+                client,
+                task_queue=task_queue(kind),
+                workflows=workflows,
+                activities=activities,
+                max_concurrent_workflow_tasks=cfg.max_concurrent_workflow_tasks,
+                max_cached_workflows=cfg.max_cached_workflows,
+                graceful_shutdown_timeout=timedelta(seconds=cfg.graceful_shutdown_seconds),
+                **options,
+            )
+        )
+    return workers
+
+
 async def main() -> None:
     temporal_address = f"{settings.temporal.hostname}:{settings.temporal.port}"
     logger.info("Connecting to Temporal", address=temporal_address)
 
-    async def _factory() -> Client:
-        return await Client.connect(
-            temporal_address,
-            namespace=settings.temporal.namespace,
-        )
-
-    client = await _connect_with_retry(_factory)
+    client = await _connect_with_retry(connect_client)
     logger.info("Temporal connection established")
 
-    await worker.Worker(
-        client,
-        task_queue="campaign-production",
-        workflows=[CampaignWorkflow],
-        activities=[intake_activity],
-    ).run()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    with contextlib.ExitStack() as pools:
+        workers = build_workers(client, pools)
+        if not workers:
+            raise RuntimeError("No task queues to serve")
+        runs = [asyncio.create_task(w.run()) for w in workers]
+        logger.info("Workers started", task_queues=[w.task_queue for w in workers])
+        stopped = asyncio.create_task(stop.wait())
+        await asyncio.wait([stopped, *runs], return_when=asyncio.FIRST_COMPLETED)
+        stopped.cancel()
+        # Worker перестает брать задачи и ждет начатые activity до graceful_shutdown_seconds;
+        # очереди останавливаются параллельно, пулы закрываются после них
+        logger.info("Draining workers", timeout_seconds=settings.temporal.graceful_shutdown_seconds)
+        await asyncio.gather(*(w.shutdown() for w in workers))
+        await asyncio.gather(*runs)
+    # Кодек payload ходит в хранилище через его общий пул потоков
+    await close_storage()
+    logger.info("Workers stopped")
 
 
 if __name__ == "__main__":